@@ -1,15 +1,184 @@
 import os
+import copy
 import git
-from collections import defaultdict, Counter
+import multiprocessing
+import threading
+import hashlib
+import pickle
+from collections import defaultdict, Counter, OrderedDict
 from datetime import datetime, timedelta, timezone
-import git
-import os
 import re
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, Iterable, List, Tuple, Optional, Any
 from dataclasses import dataclass
-from textblob import TextBlob
+from textblob import Blobber
 import numpy as np
 
+# Shared TextBlob factory so the sentiment analyzer/tokenizer are set up once
+_BLOBBER = Blobber()
+
+# Number of commit messages handed to each worker process
+_SENTIMENT_CHUNK_SIZE = 256
+
+# Below this many commits scoring in-process beats starting a pool
+_PARALLEL_SENTIMENT_MIN_COMMITS = 4 * _SENTIMENT_CHUNK_SIZE
+
+def _score_messages(messages: List[str]) -> List[float]:
+    """Score a chunk of commit messages (runs inside worker processes)."""
+    return [_BLOBBER(message).sentiment.polarity for message in messages]
+
+def _iter_commits_with_stats(repo: git.Repo, since: Optional[datetime] = None):
+    """
+    Yield commit metadata and per-file line counts from a single `git log --numstat`.
+    
+    Reading commit.stats through GitPython spawns a `git diff` per commit, so
+    the whole history is streamed and parsed in one subprocess instead.
+    
+    Yields:
+        dict: {'hash', 'author', 'datetime', 'subject', 'files': [(path, insertions, deletions)]}
+    """
+    kwargs = {'since': since} if since is not None else {}
+    output = repo.git.log('--numstat', '--pretty=format:%H%x01%an%x01%cI%x01%s', **kwargs)
+    
+    record = None
+    for line in output.splitlines():
+        if '\x01' in line:
+            if record is not None:
+                yield record
+            commit_hash, author, committed, subject = line.split('\x01', 3)
+            record = {
+                'hash': commit_hash,
+                'author': author,
+                'datetime': datetime.fromisoformat(committed),
+                'subject': subject,
+                'files': [],
+            }
+        elif line.strip() and record is not None:
+            insertions, deletions, path = line.split('\t', 2)
+            # Binary files are reported as "-" by numstat
+            record['files'].append((
+                path,
+                int(insertions) if insertions != '-' else 0,
+                int(deletions) if deletions != '-' else 0,
+            ))
+    
+    if record is not None:
+        yield record
+
+@dataclass(frozen=True)
+class _LogCommit:
+    """The subset of git.Commit attributes the analyses read, filled from `git log`."""
+    hexsha: str
+    committed_date: int
+    committer_tz_offset: int
+    committed_datetime: datetime
+    message: str
+
+def _iter_log_commits(repo: git.Repo, since: Optional[datetime] = None):
+    """
+    Yield lightweight commit records from a single `git log` stream.
+    
+    repo.iter_commits() hands back lazy git.Commit objects whose attributes are
+    read and parsed from the object database one commit at a time; the fields
+    the analyses need are formatted by git itself and split here instead.
+    """
+    kwargs = {'since': since} if since is not None else {}
+    output = repo.git.log('--pretty=format:%x1e%H%x1f%ct%x1f%cI%x1f%B', **kwargs)
+    
+    for entry in output.split('\x1e'):
+        if not entry:
+            continue
+        commit_hash, committed, committed_iso, message = entry.split('\x1f', 3)
+        committed_dt = datetime.fromisoformat(committed_iso)
+        yield _LogCommit(
+            hexsha=commit_hash,
+            committed_date=int(committed),
+            # Seconds west of UTC, matching git.Commit.committer_tz_offset
+            committer_tz_offset=-int(committed_dt.utcoffset().total_seconds()),
+            committed_datetime=committed_dt,
+            message=message,
+        )
+
+# Analysis results are memoized per repository HEAD, in-process and on disk.
+# Keys include the day, so files older than a couple of days are never hit
+# again; the disk cache is pruned by age and count whenever it is written.
+ANALYSIS_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'devwell', 'git_analysis')
+_ANALYSIS_CACHE_SIZE = 128
+_ANALYSIS_DISK_CACHE_SIZE = 512
+_ANALYSIS_DISK_MAX_AGE = timedelta(days=2)
+_analysis_cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+def _head_sha(repo: git.Repo) -> Optional[str]:
+    """Return the HEAD commit hash, or None for an empty repository."""
+    try:
+        return repo.head.commit.hexsha
+    except ValueError:
+        return None
+
+def _analysis_cache_key(*parts) -> str:
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+def _load_cached_analysis(key: str) -> Optional[Dict[str, Any]]:
+    """Look up a memoized analysis result, falling back to the on-disk cache.
+    
+    Returns a copy, so callers may modify it without touching the cache.
+    """
+    with _analysis_cache_lock:
+        result = _analysis_cache.get(key)
+        if result is not None:
+            _analysis_cache.move_to_end(key)
+            return copy.deepcopy(result)
+    path = os.path.join(ANALYSIS_CACHE_DIR, f'{key}.pkl')
+    try:
+        with open(path, 'rb') as f:
+            result = pickle.load(f)
+        # Pruning goes by mtime, so a hit keeps the file
+        os.utime(path)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    _remember_analysis(key, result)
+    return copy.deepcopy(result)
+
+def _store_cached_analysis(key: str, result: Dict[str, Any]) -> None:
+    """Memoize an analysis result; disk errors only cost the cache, never the analysis."""
+    _remember_analysis(key, copy.deepcopy(result))
+    path = os.path.join(ANALYSIS_CACHE_DIR, f'{key}.pkl')
+    try:
+        os.makedirs(ANALYSIS_CACHE_DIR, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        _prune_analysis_cache_dir()
+    except OSError as e:
+        print(f"Could not write git analysis cache: {str(e)}")
+
+def _prune_analysis_cache_dir() -> None:
+    """Delete cache files past _ANALYSIS_DISK_MAX_AGE, then the least recently used over the size limit."""
+    entries = []
+    for entry in os.scandir(ANALYSIS_CACHE_DIR):
+        if entry.name.endswith('.pkl'):
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                continue
+    entries.sort(reverse=True)
+    cutoff = (datetime.now() - _ANALYSIS_DISK_MAX_AGE).timestamp()
+    for i, (mtime, path) in enumerate(entries):
+        if i >= _ANALYSIS_DISK_CACHE_SIZE or mtime < cutoff:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def _remember_analysis(key: str, result: Dict[str, Any]) -> None:
+    """Keep a result in the in-process cache, evicting the least recently used."""
+    with _analysis_cache_lock:
+        _analysis_cache[key] = result
+        _analysis_cache.move_to_end(key)
+        while len(_analysis_cache) > _ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+
 @dataclass
 class CommitAnalysis:
     hash: str
@@ -30,8 +199,29 @@ class GitAnalyzer:
     
     def _get_commit_sentiment(self, message: str) -> float:
         """Analyze sentiment of a commit message."""
-        analysis = TextBlob(message)
+        analysis = _BLOBBER(message)
         return analysis.sentiment.polarity  # Range from -1 to 1
+
+    def _get_commit_sentiments(self, commits: List[git.Commit], num_workers: Optional[int] = 1) -> List[float]:
+        """Analyze sentiment of all commit messages, sharding across processes if requested.
+        
+        num_workers=None uses one process per CPU once there are at least
+        _PARALLEL_SENTIMENT_MIN_COMMITS messages, and scores in-process below that.
+        Workers are started from a forkserver rather than forked from the caller,
+        which may be running thread pools of its own.
+        """
+        messages = [commit.message for commit in commits]
+        if num_workers is None:
+            num_workers = (os.cpu_count() or 1) if len(messages) >= _PARALLEL_SENTIMENT_MIN_COMMITS else 1
+        if num_workers > 1 and len(messages) > _SENTIMENT_CHUNK_SIZE:
+            chunks = [
+                messages[i:i + _SENTIMENT_CHUNK_SIZE]
+                for i in range(0, len(messages), _SENTIMENT_CHUNK_SIZE)
+            ]
+            with multiprocessing.get_context('forkserver').Pool(processes=num_workers) as pool:
+                # map() keeps chunk order so sentiments line up with commits
+                return [score for chunk in pool.map(_score_messages, chunks) for score in chunk]
+        return _score_messages(messages)
     
     def _is_late_night_commit(self, commit_time: datetime) -> bool:
         """Check if commit was made late at night (10 PM to 4 AM)."""
@@ -41,13 +231,16 @@ class GitAnalyzer:
         """Check if commit was made on a weekend."""
         return commit_time.weekday() >= 5  # 5=Saturday, 6=Sunday
     
-    def analyze_repository(self, repo_path: str, days_back: int = 30) -> Dict[str, Any]:
+    def analyze_repository(self, repo_path: str, days_back: int = 30,
+                           num_workers: Optional[int] = 1) -> Dict[str, Any]:
         """
         Perform comprehensive analysis of a git repository.
         
         Args:
             repo_path: Path to the git repository
             days_back: Number of days to analyze (default: 30)
+            num_workers: Processes used to score commit messages (default: 1, no pool;
+                None for one per CPU on large histories, see _get_commit_sentiments)
             
         Returns:
             Dict containing analysis results
@@ -56,22 +249,45 @@ class GitAnalyzer:
             self.repo = git.Repo(repo_path)
             since_date = datetime.now() - timedelta(days=days_back)
             
+            # Results only change when HEAD moves or the day-based window slides
+            head_sha = _head_sha(self.repo)
+            cache_key = _analysis_cache_key(
+                'analyze_repository', os.path.abspath(repo_path), head_sha, days_back, since_date.date()
+            )
+            if head_sha is not None:
+                cached = _load_cached_analysis(cache_key)
+                if cached is not None:
+                    return cached
+            
             # Reset analysis data
             self.commits_analysis = []
             
             # Get all commits within the specified time range
-            commits = list(self.repo.iter_commits(since=since_date))
+            commits = list(_iter_log_commits(self.repo, since=since_date))
+            
+            # Score every commit message once and share it between analyses
+            sentiments = self._get_commit_sentiments(commits, num_workers)
+            
+            # Read each commit's timestamp once; GitPython re-parses it on every access
+            commit_dts = self._get_commit_datetimes(commits)
+            local_ts = self._get_local_timestamps(commits)
+            
+            # Collect per-file line counts for the same range in one git call
+            commit_stats = list(_iter_commits_with_stats(self.repo, since=since_date))
             
             # Initialize metrics
             metrics = {
-                'commit_patterns': self.get_commit_patterns(repo_path, commits),
-                'sentiment_analysis': self.analyze_commit_sentiment(commits),
-                'burnout_indicators': self.detect_burnout_indicators(commits),
-                'productivity_metrics': self.get_productivity_metrics(commits),
-                'file_analysis': self.analyze_file_changes(commits),
-                'time_analysis': self.analyze_commit_timing(commits),
+                'commit_patterns': self.get_commit_patterns(repo_path, commits, local_ts),
+                'sentiment_analysis': self.analyze_commit_sentiment(commits, sentiments),
+                'burnout_indicators': self.detect_burnout_indicators(commits, sentiments, commit_dts, local_ts),
+                'productivity_metrics': self.get_productivity_metrics(commits, commit_dts),
+                'file_analysis': self.analyze_file_changes(commits, commit_stats),
+                'time_analysis': self.analyze_commit_timing(commits, local_ts),
             }
             
+            if head_sha is not None:
+                _store_cached_analysis(cache_key, metrics)
+            
             return metrics
             
         except git.InvalidGitRepositoryError:
@@ -79,42 +295,51 @@ class GitAnalyzer:
         except Exception as e:
             raise Exception(f"Error analyzing repository: {str(e)}")
     
-    def get_commit_patterns(self, repo_path: str, commits: Optional[List[git.Commit]] = None) -> Dict[str, Any]:
+    def get_commit_patterns(self, repo_path: str, commits: Optional[List[git.Commit]] = None,
+                            local_ts: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Analyze commit timing and frequency patterns."""
-        if commits is None:
-            commits = list(self.repo.iter_commits())
+        if local_ts is None:
+            if commits is None:
+                commits = list(_iter_log_commits(self.repo))
+            local_ts = self._get_local_timestamps(commits)
         
-        if not commits:
+        total = len(local_ts)
+        if not total:
             return {}
             
-        # Analyze commit times
-        commit_times = [commit.committed_datetime for commit in commits]
-        commit_hours = [dt.hour for dt in commit_times]
-        commit_days = [dt.weekday() for dt in commit_times]  # 0=Monday, 6=Sunday
+        # Histogram hours and weekdays over the whole array at once
+        hours, weekdays = self._get_hours_and_weekdays(local_ts)
+        hour_counts = np.bincount(hours, minlength=24)
+        day_counts = np.bincount(weekdays, minlength=7)  # 0=Monday, 6=Sunday
+        active_days = np.unique(local_ts // 86400).size
         
         return {
-            'total_commits': len(commits),
-            'commit_frequency': len(commits) / 30,  # per day average
-            'commit_hour_distribution': dict(Counter(commit_hours)),
-            'commit_day_distribution': dict(Counter(commit_days)),
-            'avg_commits_per_day': len(commits) / len(set(dt.date() for dt in commit_times)) if commits else 0,
+            'total_commits': total,
+            'commit_frequency': total / 30,  # per day average
+            'commit_hour_distribution': {hour: int(n) for hour, n in enumerate(hour_counts) if n},
+            'commit_day_distribution': {day: int(n) for day, n in enumerate(day_counts) if n},
+            'avg_commits_per_day': total / active_days,
         }
     
-    def analyze_commit_sentiment(self, commits: List[git.Commit]) -> Dict[str, Any]:
+    def analyze_commit_sentiment(self, commits: List[git.Commit],
+                                 sentiments: Optional[List[float]] = None) -> Dict[str, Any]:
         """Analyze sentiment trends in commit messages."""
         if not commits:
             return {}
             
-        sentiments = []
-        for commit in commits:
-            sentiment = self._get_commit_sentiment(commit.message)
-            sentiments.append(sentiment)
+        if sentiments is None:
+            sentiments = self._get_commit_sentiments(commits)
+        if not len(sentiments):
+            return {'avg_sentiment': 0, 'sentiment_trend': [], 'positive_commits_ratio': 0, 'negative_commits_ratio': 0}
+            
+        # Convert once and reduce on the array instead of re-walking the list
+        scores = np.asarray(sentiments, dtype=np.float64)
             
         return {
-            'avg_sentiment': np.mean(sentiments) if sentiments else 0,
-            'sentiment_trend': list(sentiments[-30:]),  # Last 30 commits
-            'positive_commits_ratio': sum(1 for s in sentiments if s > 0.1) / len(sentiments) if sentiments else 0,
-            'negative_commits_ratio': sum(1 for s in sentiments if s < -0.1) / len(sentiments) if sentiments else 0,
+            'avg_sentiment': float(scores.mean()),
+            'sentiment_trend': scores[-30:].tolist(),  # Last 30 commits
+            'positive_commits_ratio': float((scores > 0.1).mean()),
+            'negative_commits_ratio': float((scores < -0.1).mean()),
         }
     
     def _make_tz_aware(self, dt: datetime) -> datetime:
@@ -122,19 +347,53 @@ class GitAnalyzer:
         if dt.tzinfo is None:
             return dt.replace(tzinfo=timezone.utc)
         return dt
+    
+    def _get_commit_datetimes(self, commits: Iterable[git.Commit]) -> List[datetime]:
+        """Read and normalize each commit's timestamp once."""
+        return [self._make_tz_aware(commit.committed_datetime) for commit in commits]
+    
+    def _get_local_timestamps(self, commits: List[git.Commit]) -> np.ndarray:
+        """Return commit times as epoch seconds shifted into each committer's local time."""
+        # committer_tz_offset is in seconds west of UTC
+        return np.fromiter(
+            (c.committed_date - c.committer_tz_offset for c in commits),
+            dtype=np.int64,
+            count=len(commits),
+        )
+    
+    def _get_hours_and_weekdays(self, local_ts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Derive local hour (0-23) and weekday (0=Monday) arrays from local epoch seconds."""
+        hours = (local_ts // 3600) % 24
+        weekdays = (local_ts // 86400 + 3) % 7  # 1970-01-01 was a Thursday
+        return hours, weekdays
+    
+    def _get_time_masks(self, local_ts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return boolean (late_night, weekend) masks over the commit timestamps."""
+        hours, weekdays = self._get_hours_and_weekdays(local_ts)
+        # Same rules as _is_late_night_commit / _is_weekend_commit
+        return (hours >= 22) | (hours < 4), weekdays >= 5
         
-    def detect_burnout_indicators(self, commits: List[git.Commit]) -> Dict[str, Any]:
+    def detect_burnout_indicators(self, commits: List[git.Commit],
+                                  sentiments: Optional[List[float]] = None,
+                                  commit_dts: Optional[List[datetime]] = None,
+                                  local_ts: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Detect potential burnout indicators from commit history."""
         if not commits:
             return {}
             
+        if commit_dts is None:
+            commit_dts = self._get_commit_datetimes(commits)
+            
         # Analyze recent commits (last 14 days)
         recent_cutoff = self._make_tz_aware(datetime.utcnow() - timedelta(days=14))
-        recent_commits = [c for c in commits if self._make_tz_aware(c.committed_datetime) >= recent_cutoff]
+        recent_commits = sum(1 for dt in commit_dts if dt >= recent_cutoff)
         
         # Count late night and weekend commits
-        late_night = sum(1 for c in commits if self._is_late_night_commit(self._make_tz_aware(c.committed_datetime)))
-        weekend = sum(1 for c in commits if self._is_weekend_commit(self._make_tz_aware(c.committed_datetime).replace(tzinfo=None)))
+        if local_ts is None:
+            local_ts = self._get_local_timestamps(commits)
+        time_masks = self._get_time_masks(local_ts)
+        late_night = int(time_masks[0].sum())
+        weekend = int(time_masks[1].sum())
         
         # Calculate message quality (simple heuristic based on message length)
         message_quality = np.mean([min(len(c.message.strip()), 50) / 50 for c in commits]) if commits else 0
@@ -143,117 +402,147 @@ class GitAnalyzer:
             'late_night_commits': late_night,
             'weekend_commits': weekend,
             'message_quality_score': message_quality,
-            'recent_commit_frequency': len(recent_commits) / 14,  # per day
-            'burnout_risk': self._calculate_burnout_risk(commits),
+            'recent_commit_frequency': recent_commits / 14,  # per day
+            'burnout_risk': self._calculate_burnout_risk(commits, sentiments, commit_dts, time_masks),
         }
     
-    def get_productivity_metrics(self, commits: List[git.Commit]) -> Dict[str, Any]:
+    def get_productivity_metrics(self, commits: List[git.Commit],
+                                 commit_dts: Optional[List[datetime]] = None) -> Dict[str, Any]:
         """Calculate various productivity metrics."""
         if not commits:
             return {}
             
-        # Group commits by day
-        commits_by_day = defaultdict(list)
-        for commit in commits:
-            day = commit.committed_datetime.date()
-            commits_by_day[day].append(commit)
+        if commit_dts is None:
+            commit_dts = self._get_commit_datetimes(commits)
+            
+        # Count commits by day
+        commits_by_day = Counter(dt.date() for dt in commit_dts)
             
         # Calculate daily metrics
         daily_metrics = []
-        for day, day_commits in commits_by_day.items():
+        for day, commit_count in commits_by_day.items():
             daily_metrics.append({
                 'date': day.isoformat(),
-                'commit_count': len(day_commits),
+                'commit_count': commit_count,
                 'is_weekend': day.weekday() >= 5,
             })
             
         return {
             'daily_metrics': sorted(daily_metrics, key=lambda x: x['date']),
             'avg_commits_per_day': len(commits) / len(commits_by_day) if commits_by_day else 0,
-            'busiest_day': max(commits_by_day.items(), key=lambda x: len(x[1]))[0].isoformat() if commits_by_day else None,
+            'busiest_day': commits_by_day.most_common(1)[0][0].isoformat() if commits_by_day else None,
         }
     
-    def analyze_file_changes(self, commits: List[git.Commit]) -> Dict[str, Any]:
+    def analyze_file_changes(self, commits: List[git.Commit],
+                             commit_stats: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """Analyze file change patterns."""
         if not commits:
             return {}
             
-        file_changes = defaultdict(lambda: {'insertions': 0, 'deletions': 0, 'commits': 0})
+        if commit_stats is None:
+            # Stream numstat for the window covered by `commits` and keep only those commits
+            hashes = {commit.hexsha for commit in commits}
+            oldest = min(commit.committed_datetime for commit in commits)
+            commit_stats = [
+                record for record in _iter_commits_with_stats(self.repo, since=oldest)
+                if record['hash'] in hashes
+            ]
+            
+        import pandas as pd
         
-        for commit in commits:
-            try:
-                for file in commit.stats.files.values():
-                    file_changes[file['filename']]['insertions'] += file['insertions']
-                    file_changes[file['filename']]['deletions'] += file['deletions']
-                    file_changes[file['filename']]['commits'] += 1
-            except (AttributeError, KeyError):
-                continue
+        # One row per (commit, file) from the numstat stream
+        df = pd.DataFrame(
+            [(path, ins, dels, record['hash'])
+             for record in commit_stats
+             for path, ins, dels in record['files']],
+            columns=['file', 'ins', 'del', 'hash'],
+        )
+        if df.empty:
+            return {
+                'top_changed_files': [],
+                'total_files_changed': 0,
+                'total_insertions': 0,
+                'total_deletions': 0,
+            }
+            
+        file_changes = df.groupby('file', sort=False).agg(
+            insertions=('ins', 'sum'),
+            deletions=('del', 'sum'),
+            commits=('hash', 'nunique'),
+        )
                 
         # Get top changed files
-        top_changed = sorted(
-            [{'file': k, **v} for k, v in file_changes.items()],
-            key=lambda x: x['commits'],
-            reverse=True
-        )[:10]
+        top_changed = file_changes.nlargest(10, 'commits').reset_index().to_dict('records')
         
         return {
             'top_changed_files': top_changed,
             'total_files_changed': len(file_changes),
-            'total_insertions': sum(f['insertions'] for f in file_changes.values()),
-            'total_deletions': sum(f['deletions'] for f in file_changes.values()),
+            'total_insertions': int(df['ins'].sum()),
+            'total_deletions': int(df['del'].sum()),
         }
     
-    def analyze_commit_timing(self, commits: List[git.Commit]) -> Dict[str, Any]:
+    def analyze_commit_timing(self, commits: List[git.Commit],
+                              local_ts: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Analyze commit timing patterns."""
         if not commits:
             return {}
             
+        if local_ts is None:
+            local_ts = self._get_local_timestamps(commits)
+            
         # Group commits by hour and day
-        hourly = defaultdict(int)
-        daily = defaultdict(int)
-        
-        for commit in commits:
-            dt = commit.committed_datetime
-            hourly[dt.hour] += 1
-            daily[dt.weekday()] += 1
+        hours, weekdays = self._get_hours_and_weekdays(local_ts)
+        hourly = np.bincount(hours, minlength=24)
+        daily = np.bincount(weekdays, minlength=7)
+            
+        late_night, weekend = self._get_time_masks(local_ts)
             
         return {
-            'hourly_commits': dict(sorted(hourly.items())),
-            'daily_commits': dict(sorted(daily.items())),
-            'late_night_ratio': sum(1 for c in commits if self._is_late_night_commit(c.committed_datetime)) / len(commits),
-            'weekend_ratio': sum(1 for c in commits if self._is_weekend_commit(c.committed_datetime)) / len(commits),
+            'hourly_commits': {hour: int(n) for hour, n in enumerate(hourly) if n},
+            'daily_commits': {day: int(n) for day, n in enumerate(daily) if n},
+            'late_night_ratio': float(late_night.mean()),
+            'weekend_ratio': float(weekend.mean()),
         }
     
-    def _calculate_burnout_risk(self, commits: List[git.Commit]) -> float:
+    def _calculate_burnout_risk(self, commits: List[git.Commit],
+                                sentiments: Optional[List[float]] = None,
+                                commit_dts: Optional[List[datetime]] = None,
+                                time_masks: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> float:
         """Calculate a burnout risk score (0-1)."""
         if not commits:
             return 0.0
             
+        if commit_dts is None:
+            commit_dts = self._get_commit_datetimes(commits)
+        if time_masks is None:
+            time_masks = self._get_time_masks(self._get_local_timestamps(commits))
+            
         risk_factors = []
         
         # 1. Late night commits
-        late_night = sum(1 for c in commits if self._is_late_night_commit(c.committed_datetime))
+        late_night = int(time_masks[0].sum())
         risk_factors.append(min(late_night / len(commits) * 2, 1.0))  # Up to 50% weight
         
         # 2. Weekend work
-        weekend = sum(1 for c in commits if self._is_weekend_commit(c.committed_datetime))
+        weekend = int(time_masks[1].sum())
         risk_factors.append(min(weekend / len(commits) * 2, 1.0))  # Up to 50% weight
         
         # 3. Negative sentiment trend (last 10% of commits)
         if len(commits) > 10:
-            recent = commits[:len(commits)//10]
-            sentiments = [self._get_commit_sentiment(c.message) for c in recent]
-            if len(sentiments) > 1:
-                trend = (sentiments[-1] - np.mean(sentiments[:-1])) / (1 if np.mean(sentiments[:-1]) == 0 else abs(np.mean(sentiments[:-1])))
+            recent_count = len(commits) // 10
+            if sentiments is None:
+                sentiments = self._get_commit_sentiments(commits[:recent_count])
+            recent = np.asarray(sentiments[:recent_count], dtype=np.float64)
+            if len(recent) > 1:
+                baseline = recent[:-1].mean()
+                trend = (recent[-1] - baseline) / (1 if baseline == 0 else abs(baseline))
                 risk_factors.append(max(0, min(-trend, 1.0)))  # Negative trend increases risk
         
         # 4. Erratic commit patterns (variance in daily commits)
         if len(commits) > 7:
-            daily_counts = defaultdict(int)
-            for c in commits:
-                daily_counts[c.committed_datetime.date()] += 1
+            daily_counts = Counter(dt.date() for dt in commit_dts)
             if len(daily_counts) > 1:
-                variance = np.var(list(daily_counts.values()))
+                variance = np.fromiter(daily_counts.values(), dtype=np.float64).var()
                 risk_factors.append(min(variance / 10, 1.0))  # High variance increases risk
         
         return min(sum(risk_factors) / len(risk_factors), 1.0) if risk_factors else 0.0
@@ -271,51 +560,59 @@ def analyze_commit_patterns(repo_path):
     try:
         repo = git.Repo(repo_path)
         
+        # The full-history summary only changes when HEAD moves
+        head_sha = _head_sha(repo)
+        cache_key = _analysis_cache_key('analyze_commit_patterns', os.path.abspath(repo_path), head_sha)
+        if head_sha is not None:
+            cached = _load_cached_analysis(cache_key)
+            if cached is not None:
+                return cached
+        
         # Initialize data structures
-        commits = list(repo.iter_commits())
-        authors = defaultdict(int)
-        files_changed = defaultdict(int)
-        hourly_commits = defaultdict(int)
-        daily_commits = defaultdict(int)
+        authors = Counter()
+        files_changed = Counter()
+        hourly_commits = Counter()
+        daily_commits = Counter()
+        total_commits = 0
+        first_commit = None
+        last_commit = None
         
-        # Process commits
-        for commit in commits:
-            # Count commits by author
-            authors[commit.author.name] += 1
+        # Stream the history in one pass instead of holding every commit in memory
+        for commit in _iter_commits_with_stats(repo):
+            total_commits += 1
             
-            # Count file changes
-            for file in commit.stats.files.keys():
-                files_changed[file] += 1
+            # Count commits by author and file changes
+            authors[commit['author']] += 1
+            files_changed.update(path for path, _, _ in commit['files'])
             
             # Track commit times
-            commit_time = commit.committed_datetime
-            hour = commit_time.hour
-            day = commit_time.strftime('%A')
+            commit_time = commit['datetime']
+            hourly_commits[commit_time.hour] += 1
+            daily_commits[commit_time.strftime('%A')] += 1
             
-            hourly_commits[hour] += 1
-            daily_commits[day] += 1
+            if first_commit is None or commit_time < first_commit:
+                first_commit = commit_time
+            if last_commit is None or commit_time > last_commit:
+                last_commit = commit_time
         
         # Calculate productivity metrics
-        first_commit = commits[-1].committed_datetime if commits else None
-        last_commit = commits[0].committed_datetime if commits else None
-        
         total_days = (last_commit - first_commit).days if first_commit and last_commit else 1
-        commits_per_day = len(commits) / total_days if total_days > 0 else 0
+        commits_per_day = total_commits / total_days if total_days > 0 else 0
         
         # Get most active hour and day
-        most_active_hour = max(hourly_commits.items(), key=lambda x: x[1]) if hourly_commits else (None, 0)
-        most_active_day = max(daily_commits.items(), key=lambda x: x[1]) if daily_commits else (None, 0)
+        most_active_hour = hourly_commits.most_common(1)[0] if hourly_commits else (None, 0)
+        most_active_day = daily_commits.most_common(1)[0] if daily_commits else (None, 0)
         
         # Get most active files
-        most_active_files = sorted(files_changed.items(), key=lambda x: x[1], reverse=True)[:10]
+        most_active_files = files_changed.most_common(10)
         
-        return {
-            'total_commits': len(commits),
+        result = {
+            'total_commits': total_commits,
             'total_authors': len(authors),
             'first_commit': first_commit.isoformat() if first_commit else None,
             'last_commit': last_commit.isoformat() if last_commit else None,
             'commits_per_day': round(commits_per_day, 2),
-            'most_active_author': max(authors.items(), key=lambda x: x[1]) if authors else (None, 0),
+            'most_active_author': authors.most_common(1)[0] if authors else (None, 0),
             'most_active_hour': {
                 'hour': most_active_hour[0],
                 'commits': most_active_hour[1]
@@ -329,6 +626,11 @@ def analyze_commit_patterns(repo_path):
             'daily_pattern': [{'day': d, 'commits': c} for d, c in sorted(daily_commits.items())]
         }
         
+        if head_sha is not None:
+            _store_cached_analysis(cache_key, result)
+        
+        return result
+        
     except Exception as e:
         print(f"Error analyzing git repository: {str(e)}")
         return {
@@ -357,17 +659,16 @@ def get_code_churn(repo_path, days=30):
         
         # Get commits from the last N days
         since_date = datetime.now() - timedelta(days=days)
-        commits = list(repo.iter_commits(since=since_date))
+        commits = _iter_commits_with_stats(repo, since=since_date)
         
         # Group commits by day
         daily_changes = defaultdict(lambda: {'additions': 0, 'deletions': 0, 'commits': 0})
         
         for commit in commits:
-            date = commit.committed_datetime.date()
-            stats = commit.stats.total
+            date = commit['datetime'].date()
             
-            daily_changes[date]['additions'] += stats.get('insertions', 0)
-            daily_changes[date]['deletions'] += stats.get('deletions', 0)
+            daily_changes[date]['additions'] += sum(f[1] for f in commit['files'])
+            daily_changes[date]['deletions'] += sum(f[2] for f in commit['files'])
             daily_changes[date]['commits'] += 1
         
         # Convert to list of dicts sorted by date
@@ -1,11 +1,64 @@
-from textblob import TextBlob
-from transformers import pipeline
-import torch
+from textblob import Blobber
 import os
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from functools import lru_cache
+from collections import OrderedDict
+from hashlib import blake2b
+import threading
 # from config import Config
 
+# Shared TextBlob factory so the sentiment analyzer is set up once per process
+_BLOBBER = Blobber()
+
+# Scores above/below these thresholds are labelled positive/negative
+POSITIVE_THRESHOLD = 0.2
+NEGATIVE_THRESHOLD = -0.2
+
+
+def _classify(score):
+    """Map a single sentiment score to its label."""
+    if score > POSITIVE_THRESHOLD:
+        return 'positive'
+    if score < NEGATIVE_THRESHOLD:
+        return 'negative'
+    return 'neutral'
+
+
+# Keep-alive session so repeated API calls reuse the same TCP/TLS connection
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.2),
+)
+_session.mount('https://', _adapter)
+_session.mount('http://', _adapter)
+
+
+@lru_cache(maxsize=None)
+def _get_pipeline(model_name: str, device: int):
+    """Build the transformer sentiment pipeline once per (model, device)."""
+    # Deferred so workers that only use the API/TextBlob path never load PyTorch
+    import torch
+    from transformers import pipeline
+    
+    sentiment_pipeline = pipeline("sentiment-analysis", model=model_name, device=device)
+    
+    # On CPU, run the Linear layers as int8 GEMMs (fbgemm on x86, qnnpack elsewhere)
+    if device == -1:
+        engines = torch.backends.quantized.supported_engines
+        engine = 'fbgemm' if 'fbgemm' in engines else 'qnnpack' if 'qnnpack' in engines else None
+        if engine:
+            torch.backends.quantized.engine = engine
+            sentiment_pipeline.model = torch.ao.quantization.quantize_dynamic(
+                sentiment_pipeline.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+    
+    return sentiment_pipeline
+
 
 def analyze_sentiment_with_api(text):
     api_url = os.getenv("SENTIMENT_ANALYSIS_URL")
@@ -18,7 +71,7 @@ def analyze_sentiment_with_api(text):
         headers['x-api-key'] = api_key
 
     try:
-        response = requests.post(api_url, headers=headers, data=payload, timeout=5)
+        response = _session.post(api_url, headers=headers, data=payload, timeout=5)
 
         if response.status_code == 200:
             return response.json()
@@ -28,15 +81,10 @@ def analyze_sentiment_with_api(text):
         print(f"Request failed: {e}")
 
     # Fallback using TextBlob
-    blob = TextBlob(text)
+    blob = _BLOBBER(text)
     polarity = blob.sentiment.polarity
 
-    if polarity > 0.2:
-        label = 'positive'
-    elif polarity < -0.2:
-        label = 'negative'
-    else:
-        label = 'neutral'
+    label = _classify(polarity)
 
     return {
         'score': float(polarity),
@@ -47,6 +95,40 @@ def analyze_sentiment_with_api(text):
         'fallback': True
     }
 
+# Recent API results keyed on a digest of the text, so resubmitting the same
+# content (double-submit, saving an unchanged edit) skips the round trip
+_SENTIMENT_CACHE_SIZE = 1024
+_sentiment_cache = OrderedDict()
+_sentiment_cache_lock = threading.Lock()
+
+
+def analyze_sentiment_cached(text):
+    """
+    analyze_sentiment_with_api, memoized on a BLAKE2b digest of the text.
+    
+    TextBlob fallback results are not cached so the API is retried next time.
+    
+    Args:
+        text (str): The text to analyze
+        
+    Returns:
+        dict: Sentiment dict (a copy, safe to modify)
+    """
+    key = blake2b(text.encode('utf-8'), digest_size=16).digest()
+    with _sentiment_cache_lock:
+        cached = _sentiment_cache.get(key)
+        if cached is not None:
+            _sentiment_cache.move_to_end(key)
+            return dict(cached)
+    
+    result = analyze_sentiment_with_api(text)
+    if not result.get('fallback'):
+        with _sentiment_cache_lock:
+            _sentiment_cache[key] = dict(result)
+            if len(_sentiment_cache) > _SENTIMENT_CACHE_SIZE:
+                _sentiment_cache.popitem(last=False)
+    return result
+
 def analyze_sentiment(text):
     """
     Analyze the sentiment of the given text using TextBlob and Transformers.
@@ -58,29 +140,22 @@ def analyze_sentiment(text):
         dict: Dictionary containing sentiment score and label
     """
     # Simple sentiment analysis with TextBlob
-    blob = TextBlob(text)
+    blob = _BLOBBER(text)
     polarity = blob.sentiment.polarity  # -1 to 1
     
     # Map polarity to sentiment label
-    if polarity > 0.2:
-        label = 'positive'
-    elif polarity < -0.2:
-        label = 'negative'
-    else:
-        label = 'neutral'
+    label = _classify(polarity)
     
     # For more complex analysis, we can use a pre-trained transformer model
     try:
+        import torch
+        
         # Check if we have a GPU
         device = 0 if torch.cuda.is_available() else -1
         
-        # Initialize sentiment analysis pipeline
-        sentiment_pipeline = pipeline(
-            "sentiment-analysis",
-            # model="distilbert-base-uncased-finetuned-sst-2-english",
-            model="prajjwal1/bert-tiny",
-            device=device
-        )
+        # Reuse the cached sentiment analysis pipeline
+        # model="distilbert-base-uncased-finetuned-sst-2-english"
+        sentiment_pipeline = _get_pipeline("prajjwal1/bert-tiny", device)
         
         # Get transformer-based sentiment
         result = sentiment_pipeline(text[:512])[0]  # Limit to 512 tokens
@@ -93,12 +168,7 @@ def analyze_sentiment(text):
         combined_score = (polarity + (transformer_score if transformer_label == 'positive' else -transformer_score)) / 2
         
         # Update label based on combined score
-        if combined_score > 0.2:
-            label = 'positive'
-        elif combined_score < -0.2:
-            label = 'negative'
-        else:
-            label = 'neutral'
+        label = _classify(combined_score)
             
         return {
             'score': float(combined_score),
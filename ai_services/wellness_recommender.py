@@ -1,74 +1,261 @@
-import random
-from datetime import datetime, time, timedelta
+import time
+from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
+from functools import lru_cache
+from types import MappingProxyType
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.preprocessing import StandardScaler
 import joblib
 import os
+import bisect
+
+# Time-of-day buckets used to tag recommendation templates
+TIME_ANY, TIME_MORNING, TIME_AFTERNOON, TIME_EVENING = range(4)
+
+# Keywords that mark a recommendation as suited to a particular time of day
+MORNING_WORDS = ('morning', 'breakfast', 'start your day')
+AFTERNOON_WORDS = ('afternoon', 'lunch')
+EVENING_WORDS = ('evening', 'night', 'dinner')
+
+# Hour breakpoints and the time-bucket weights for each range between them,
+# indexed by TIME_ANY, TIME_MORNING, TIME_AFTERNOON, TIME_EVENING
+_HOUR_BREAKS = (5, 10, 12, 17, 22)
+_HOUR_BUCKET_WEIGHTS = (
+    (1.0, 1.0, 1.0, 1.0),  # 0-4
+    (1.0, 1.3, 1.0, 1.0),  # 5-9 morning
+    (1.0, 1.0, 1.0, 1.0),  # 10-11
+    (1.0, 1.0, 1.3, 1.0),  # 12-16 afternoon
+    (1.0, 1.0, 1.0, 1.3),  # 17-21 evening
+    (1.0, 1.0, 1.0, 1.0)   # 22-23
+)
+
+
+def _classify_rec_time(rec_text: str) -> int:
+    """Classify a recommendation as a morning/afternoon/evening activity (or any time)."""
+    text_lower = rec_text.lower()
+    if any(time_word in text_lower for time_word in MORNING_WORDS):
+        return TIME_MORNING
+    elif any(time_word in text_lower for time_word in AFTERNOON_WORDS):
+        return TIME_AFTERNOON
+    elif any(time_word in text_lower for time_word in EVENING_WORDS):
+        return TIME_EVENING
+    return TIME_ANY
+
+
+def _burnout_kernel(weekly_hours: float, avg_daily_commits: float,
+                    schedule_regularity: float, avg_sentiment: float,
+                    collaboration_score: float, w_long: float, w_commit: float,
+                    w_irreg: float, w_neg: float, w_social: float) -> float:
+    """Score burnout risk from plain floats so no dict lookups happen in the arithmetic."""
+    risk_score = 0.0
+    
+    # Calculate risk based on working hours
+    if weekly_hours > 50:  # More than 50 hours/week
+        risk_score += w_long * 1.0
+    elif weekly_hours > 40:
+        risk_score += w_long * 0.7
+        
+    # Check for high commit frequency (potential overwork)
+    if avg_daily_commits > 10:
+        risk_score += w_commit * 0.8
+        
+    # Check for irregular work schedule
+    if schedule_regularity < 0.5:  # 0-1 scale, lower is more irregular
+        risk_score += w_irreg * 0.6
+        
+    # Check for negative sentiment in journal entries
+    if avg_sentiment < -0.3:
+        risk_score += w_neg * 0.9
+        
+    # Check for low social interaction (fewer commits with multiple authors)
+    if collaboration_score < 0.3:
+        risk_score += w_social * 0.5
+        
+    return min(1.0, max(0.0, risk_score))  # Ensure score is between 0 and 1
+
+
+def _score_kernel(base_scores: np.ndarray, rec_time_ids: np.ndarray, weekend_flags: np.ndarray,
+                  time_weights: np.ndarray, weekend_weight: float, ml_weight: float) -> np.ndarray:
+    """Score every template of a category at once from its precomputed arrays."""
+    scores = base_scores * time_weights[rec_time_ids]
+    scores *= np.where(weekend_flags, weekend_weight, 1.0)
+    scores *= ml_weight
+    return scores
+
+
+# Interventions per burnout risk level as (type, title, description, priority) rows
+_INTERVENTION_FIELDS = ('type', 'title', 'description', 'priority')
+_INTERVENTIONS = {
+    'high': (
+        ('immediate_break', 'Take an Immediate Break',
+         'Step away from work for at least 30 minutes. Take a walk outside if possible.',
+         'critical'),
+        ('schedule_review', 'Schedule Time Off',
+         'Plan at least 1-2 days off in the next week to recover.',
+         'high'),
+        ('professional_help', 'Consider Professional Support',
+         'Speak with a mental health professional about stress management.',
+         'high')
+    ),
+    'moderate': (
+        ('microbreaks', 'Schedule Regular Microbreaks',
+         'Take 5-minute breaks every 50 minutes to stretch and rest your eyes.',
+         'medium'),
+        ('workload_review', 'Review Workload',
+         'Identify tasks that can be delegated or postponed.',
+         'medium'),
+        ('mindfulness', 'Practice Mindfulness',
+         'Try a 5-minute guided meditation to reduce stress.',
+         'medium')
+    ),
+    'low': (
+        ('preventive_breaks', 'Maintain Healthy Habits',
+         'Continue taking regular breaks and maintaining work-life balance.',
+         'low'),
+        ('self_reflection', 'Reflect on Well-being',
+         'Journal about your current work habits and well-being.',
+         'low')
+    )
+}
+
+
+# Daily wellness plan; read-only and shared by every caller
+_DAILY_PLAN = MappingProxyType({
+    'morning': (
+        "Start with 5 minutes of stretching or light exercise",
+        "Set 3 main goals for the day",
+        "Eat a healthy breakfast"
+    ),
+    'work_session': (
+        "Use the Pomodoro technique (25 min work, 5 min break)",
+        "Take a short walk after completing each major task",
+        "Stay hydrated and take regular screen breaks"
+    ),
+    'evening': (
+        "Reflect on 3 things that went well today",
+        "Disconnect from screens 30 minutes before bed",
+        "Prepare for tomorrow by reviewing your schedule"
+    )
+})
+
+
+# user_data keys that generate_daily_tips reads; users agreeing on all of
+# them (with the same clock) get the same tips
+_TIP_INPUT_FIELDS = ('hours_since_last_break', 'days_since_last_journal',
+                     'work_life_balance_score', 'avg_sentiment', 'recent_activity')
 
 class WellnessRecommender:
     """
     Provides wellness recommendations based on developer activity and journal entries.
     """
     
-    def __init__(self, model_path: str = None):
+    # Recommendation templates with evidence-based practices, as (text, base_score)
+    RECOMMENDATION_TEMPLATES = {
+        'break_reminders': [
+            ("Consider a 5-minute break after 50 minutes of focused work. "
+             "Research shows this improves focus and reduces eye strain.", 0.8),
+            ("Time for a microbreak! Look away from your screen for 20 seconds "
+             "to reduce digital eye strain.", 0.7),
+            ("You've been working for a while. Try the 20-20-20 rule: every 20 minutes, "
+             "look at something 20 feet away for 20 seconds.", 0.9)
+        ],
+        'journaling_prompts': [
+            ("Reflect on your current emotional state. What's contributing to it?", 0.7),
+            ("Write about a challenge you're facing and possible solutions.", 0.6),
+            ("List three things that went well today and why.", 0.8)
+        ],
+        'work_schedule': [
+            ("Consider adjusting your work hours to match your natural energy levels. "
+             "Your most productive hours seem to be in the morning.", 0.7),
+            ("Try time-blocking your schedule to align with your energy levels "
+             "throughout the day.", 0.8)
+        ],
+        'mental_health': [
+            ("Practice the 4-7-8 breathing technique: inhale for 4s, hold for 7s, "
+             "exhale for 8s. Repeat 4 times.", 0.9),
+            ("Consider a short mindfulness meditation to reduce stress and "
+             "improve focus.", 0.85)
+        ],
+        'productivity': [
+            ("Try the Pomodoro technique: 25 minutes of focused work followed by "
+             "a 5-minute break.", 0.85),
+            ("Prioritize your tasks using the Eisenhower Matrix to focus on what's "
+             "important and urgent.", 0.8)
+        ]
+    }
+    
+    # Templates tagged once at import with their time of day and weekend relevance
+    # as (text, base_score, time_bucket, is_weekend) so no instance re-scans the text
+    _TAGGED_TEMPLATES = MappingProxyType({
+        category: tuple(
+            (text, score, _classify_rec_time(text), 'weekend' in text.lower())
+            for text, score in templates
+        )
+        for category, templates in RECOMMENDATION_TEMPLATES.items()
+    })
+    
+    # Burnout risk factors and their weights
+    BURNOUT_FACTORS = MappingProxyType({
+        'long_hours': 0.25,
+        'high_commit_frequency': 0.2,
+        'irregular_schedule': 0.15,
+        'negative_sentiment': 0.3,
+        'low_social_interaction': 0.1
+    })
+    
+    # Time-of-day weights for every hour of the day, indexed by datetime.hour
+    # and then by time bucket (TIME_ANY, TIME_MORNING, ...)
+    _HOUR_TO_TIME_WEIGHTS = np.array([
+        _HOUR_BUCKET_WEIGHTS[bisect.bisect_right(_HOUR_BREAKS, hour)]
+        for hour in range(24)
+    ])
+    
+    # Column arrays of the tagged templates per category for the scoring kernel:
+    # (base_scores, time_bucket_ids, weekend_flags)
+    _TEMPLATE_ARRAYS = MappingProxyType({
+        category: (
+            np.array([t[1] for t in templates], dtype=np.float64),
+            np.array([t[2] for t in templates], dtype=np.intp),
+            np.array([t[3] for t in templates], dtype=np.bool_)
+        )
+        for category, templates in _TAGGED_TEMPLATES.items()
+    })
+    
+    def __init__(self, model_path: str = None, model=None):
         """
         Initialize the WellnessRecommender with optional ML model path.
         
         Args:
             model_path: Path to load a pre-trained ML model (optional)
+            model: An already loaded model (see load_model), shared rather than loaded again
         """
-        self.model = self._load_model(model_path) if model_path else None
+        if model is None and model_path:
+            model = self.load_model(model_path)
+        self.model = model
         self.scaler = StandardScaler()
         self.user_preferences = {}
         self.last_recommendations = {}
+        self.user_feedback = []
+        self.feature_importance = {}
         
-        # Initialize recommendation templates with evidence-based practices
-        self.recommendation_templates = {
-            'break_reminders': [
-                ("Consider a 5-minute break after 50 minutes of focused work. "
-                 "Research shows this improves focus and reduces eye strain.", 0.8),
-                ("Time for a microbreak! Look away from your screen for 20 seconds "
-                 "to reduce digital eye strain.", 0.7),
-                ("You've been working for a while. Try the 20-20-20 rule: every 20 minutes, "
-                 "look at something 20 feet away for 20 seconds.", 0.9)
-            ],
-            'journaling_prompts': [
-                ("Reflect on your current emotional state. What's contributing to it?", 0.7),
-                ("Write about a challenge you're facing and possible solutions.", 0.6),
-                ("List three things that went well today and why.", 0.8)
-            ],
-            'work_schedule': [
-                ("Consider adjusting your work hours to match your natural energy levels. "
-                 "Your most productive hours seem to be in the morning.", 0.7),
-                ("Try time-blocking your schedule to align with your energy levels "
-                 "throughout the day.", 0.8)
-            ],
-            'mental_health': [
-                ("Practice the 4-7-8 breathing technique: inhale for 4s, hold for 7s, "
-                 "exhale for 8s. Repeat 4 times.", 0.9),
-                ("Consider a short mindfulness meditation to reduce stress and "
-                 "improve focus.", 0.85)
-            ],
-            'productivity': [
-                ("Try the Pomodoro technique: 25 minutes of focused work followed by "
-                 "a 5-minute break.", 0.85),
-                ("Prioritize your tasks using the Eisenhower Matrix to focus on what's "
-                 "important and urgent.", 0.8)
-            ]
-        }
+        # Shared, read-only tables built once at import
+        self.recommendation_templates = self._TAGGED_TEMPLATES
+        self.burnout_factors = self.BURNOUT_FACTORS
         
-        # Burnout risk factors and their weights
-        self.burnout_factors = {
-            'long_hours': 0.25,
-            'high_commit_frequency': 0.2,
-            'irregular_schedule': 0.15,
-            'negative_sentiment': 0.3,
-            'low_social_interaction': 0.1
-        }
+        # Template scoring memoized on bucketed context. _model_version is part of
+        # the key and is bumped whenever feedback or training can change the outcome.
+        self._model_version = 0
+        self._cached_score_templates = lru_cache(maxsize=512)(self._score_templates)
+    
+    @staticmethod
+    def _get_time_context() -> Tuple[datetime, int, int]:
+        """Read the clock once and return (now, hour, weekday) for a request."""
+        now = datetime.now()
+        return now, now.hour, now.weekday()
     
-    def _load_model(self, model_path: str):
+    @staticmethod
+    def load_model(model_path: str):
         """Load a pre-trained ML model if available."""
         if model_path and os.path.exists(model_path):
             return joblib.load(model_path)
@@ -81,8 +268,8 @@ class WellnessRecommender:
             joblib.dump({
                 'model': self.model,
                 'user_preferences': self.user_preferences,
-                'feature_importance': getattr(self, 'feature_importance', {})
-            }, model_path)
+                'feature_importance': self.feature_importance
+            }, model_path, compress=3)
     
     def record_feedback(self, category: str, feedback: Dict):
         """Record user feedback on recommendations for ML training.
@@ -96,14 +283,12 @@ class WellnessRecommender:
             
         # Store feedback with context
         feedback_entry = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': time.time(),  # epoch seconds
             'category': category,
             'recommendation': self.last_recommendations[category],
             'feedback': feedback
         }
         
-        if not hasattr(self, 'user_feedback'):
-            self.user_feedback = []
         self.user_feedback.append(feedback_entry)
         
         # Update user preferences based on feedback
@@ -115,84 +300,119 @@ class WellnessRecommender:
             engagement = feedback.get('engagement', 0.7)
             current = self.user_preferences[category].get('engagement', 0.5)
             self.user_preferences[category]['engagement'] = min(1.0, current + 0.1 * engagement)
+        
+        self._model_version += 1
     
     def train_model(self, training_data=None):
         """Train or update the recommendation model based on collected feedback."""
-        feedback_data = training_data or getattr(self, 'user_feedback', [])
+        feedback_data = training_data or self.user_feedback
         if not feedback_data:
             return  # No data to train on
             
         # Initialize model if needed
         if self.model is None:
-            self.model = RandomForestClassifier(
-                n_estimators=50,
+            self.model = HistGradientBoostingClassifier(
+                max_iter=50,
                 max_depth=5,
                 random_state=42
             )
         
-        # Convert feedback to training examples
-        X = []
-        y = []
+        # Convert feedback to training examples, filling preallocated arrays
+        # rather than growing Python lists that sklearn would copy again
+        examples = [e for e in feedback_data if 'context' in e.get('recommendation', {})]
+        if not examples:
+            return  # No valid training examples
         
-        for entry in feedback_data:
-            if 'context' not in entry.get('recommendation', {}):
-                continue
-                
+        X = np.empty((len(examples), 4), dtype=np.float32)
+        y = np.empty(len(examples), dtype=np.int8)
+        
+        for i, entry in enumerate(examples):
             # Extract features from context
             context = entry['recommendation']['context']
-            features = [
-                context.get('time_of_day', 0) / 24.0,
-                context.get('day_of_week', 0) / 7.0,
-                context.get('sentiment', 0.0) * 0.5 + 0.5,  # Scale -1..1 to 0..1
-                self.user_preferences.get(entry['category'], {}).get('engagement', 0.5)
-            ]
+            X[i, 0] = context.get('time_of_day', 0) / 24.0
+            X[i, 1] = context.get('day_of_week', 0) / 7.0
+            X[i, 2] = context.get('sentiment', 0.0) * 0.5 + 0.5  # Scale -1..1 to 0..1
+            X[i, 3] = self.user_preferences.get(entry['category'], {}).get('engagement', 0.5)
             
             # Label is 1 for accepted recommendations, 0 for rejected
-            label = 1 if entry.get('feedback', {}).get('accepted', False) else 0
-            
-            X.append(features)
-            y.append(label)
-        
-        if not X:
-            return  # No valid training examples
+            y[i] = 1 if entry.get('feedback', {}).get('accepted', False) else 0
             
         # Train the model
         self.model.fit(X, y)
+        self._model_version += 1
     
     def _calculate_burnout_risk_score(self, git_data: Dict, journal_data: Dict) -> float:
         """Calculate a burnout risk score based on git and journal data."""
-        risk_score = 0.0
+        factors = self.burnout_factors
+        return _burnout_kernel(
+            float(git_data.get('weekly_hours', 0)),
+            float(git_data.get('avg_daily_commits', 0)),
+            float(git_data.get('schedule_regularity', 0)),
+            float(journal_data.get('avg_sentiment', 0)),
+            float(git_data.get('collaboration_score', 0)),
+            factors['long_hours'],
+            factors['high_commit_frequency'],
+            factors['irregular_schedule'],
+            factors['negative_sentiment'],
+            factors['low_social_interaction']
+        )
+    
+    def _score_templates(self, category: str, current_hour: int, day_of_week: int,
+                         sent_bucket: int, act_bucket: int, eng_bucket: int,
+                         model_version: int) -> Tuple[Optional[str], float]:
+        """Score a category's templates for a bucketed context and return the best (text, score).
         
-        # Calculate risk based on working hours
-        if git_data.get('weekly_hours', 0) > 50:  # More than 50 hours/week
-            risk_score += self.burnout_factors['long_hours'] * 1.0
-        elif git_data.get('weekly_hours', 0) > 40:
-            risk_score += self.burnout_factors['long_hours'] * 0.7
-            
-        # Check for high commit frequency (potential overwork)
-        if git_data.get('avg_daily_commits', 0) > 10:
-            risk_score += self.burnout_factors['high_commit_frequency'] * 0.8
-            
-        # Check for irregular work schedule
-        if git_data.get('schedule_regularity', 0) < 0.5:  # 0-1 scale, lower is more irregular
-            risk_score += self.burnout_factors['irregular_schedule'] * 0.6
-            
-        # Check for negative sentiment in journal entries
-        if journal_data.get('avg_sentiment', 0) < -0.3:
-            risk_score += self.burnout_factors['negative_sentiment'] * 0.9
-            
-        # Check for low social interaction (fewer commits with multiple authors)
-        if git_data.get('collaboration_score', 0) < 0.3:
-            risk_score += self.burnout_factors['low_social_interaction'] * 0.5
-            
-        return min(1.0, max(0.0, risk_score))  # Ensure score is between 0 and 1
+        Wrapped in an LRU cache by __init__; model_version only serves as part of the cache key.
+        """
+        # Look up time-based weights
+        time_weights = self._HOUR_TO_TIME_WEIGHTS[current_hour]
+        weekend_weight = 1.2 if day_of_week >= 5 else 1.0
+        
+        # Apply ML-based personalization if model is available. The features don't
+        # depend on the template, so a single prediction covers the whole category.
+        ml_weight = 1.0
+        if self.model is not None:
+            try:
+                # Prepare features for ML model
+                features = np.array([[
+                    current_hour / 24.0,  # Time of day (0-1)
+                    day_of_week / 7.0,    # Day of week (0-1)
+                    sent_bucket / 10.0 * 0.5 + 0.5,  # Scale -1..1 to 0..1
+                    act_bucket / 10.0,  # 0-1 scale
+                    eng_bucket / 10.0  # User's historical engagement
+                ]], dtype=np.float32)
+                
+                # Get prediction from model (probability of positive engagement)
+                prediction = self.model.predict_proba(features)[0][1]
+                
+                # Scale prediction to 0.5-1.5 range to adjust score
+                ml_weight = 0.5 + prediction  # 0.5-1.5 range
+                
+            except Exception as e:
+                # Fallback to base score if model prediction fails
+                pass
+        
+        # Score all templates with personalization (time, weekend and ML weights)
+        # and keep the best one; argmax favours the earliest template on ties
+        templates = self.recommendation_templates[category]
+        if not templates:
+            return None, float('-inf')
+        
+        base_scores, rec_time_ids, weekend_flags = self._TEMPLATE_ARRAYS[category]
+        scores = _score_kernel(base_scores, rec_time_ids, weekend_flags,
+                               time_weights, weekend_weight, ml_weight)
+        best = int(scores.argmax())
+        return templates[best][0], float(scores[best])
     
-    def _get_personalized_recommendation(self, category: str, user_context: Dict) -> Tuple[str, float]:
+    def _get_personalized_recommendation(self, category: str, user_context: Dict,
+                                         time_ctx: Optional[Tuple[datetime, int, int]] = None) -> Tuple[str, float]:
         """Get a personalized recommendation from a specific category.
         
         Args:
             category: The recommendation category (e.g., 'break_reminders', 'journaling_prompts')
             user_context: Dictionary containing user context like 'avg_sentiment', 'recent_activity', etc.
+            time_ctx: Optional (now, hour, weekday) tuple from _get_time_context(); read
+                from the clock when omitted
             
         Returns:
             Tuple of (recommendation_text, confidence_score)
@@ -201,101 +421,53 @@ class WellnessRecommender:
             return "", 0.0
             
         # Get current time features
-        now = datetime.now()
-        current_hour = now.hour
-        day_of_week = now.weekday()  # 0 = Monday, 6 = Sunday
+        if time_ctx is None:
+            time_ctx = self._get_time_context()
+        now, current_hour, day_of_week = time_ctx  # day_of_week: 0 = Monday, 6 = Sunday
         
-        # Get user preferences for this category
+        # Get user preferences and context features for this category
         user_pref = self.user_preferences.get(category, {})
-        
-        # Calculate time-based weights
-        time_weights = {
-            'morning': 1.0 + (0.3 if 5 <= current_hour < 10 else 0),
-            'afternoon': 1.0 + (0.3 if 12 <= current_hour < 17 else 0),
-            'evening': 1.0 + (0.3 if 17 <= current_hour < 22 else 0),
-            'weekend': 1.2 if day_of_week >= 5 else 1.0
-        }
-        
-        # Calculate recommendation scores with personalization
-        valid_recs = []
-        for rec_text, base_score in self.recommendation_templates[category]:
-            score = base_score
-            
-            # Time-based personalization
-            rec_time = 'any'
-            if any(time_word in rec_text.lower() for time_word in ['morning', 'breakfast', 'start your day']):
-                rec_time = 'morning'
-            elif any(time_word in rec_text.lower() for time_word in ['afternoon', 'lunch']):
-                rec_time = 'afternoon'
-            elif any(time_word in rec_text.lower() for time_word in ['evening', 'night', 'dinner']):
-                rec_time = 'evening'
-                
-            # Apply time-based weight
-            score *= time_weights.get(rec_time, 1.0)
-            
-            # Apply weekend boost for certain activities
-            if 'weekend' in rec_text.lower() and day_of_week >= 5:
-                score *= time_weights['weekend']
-                
-            # Apply ML-based personalization if model is available
-            if hasattr(self, 'model') and self.model is not None:
-                try:
-                    # Prepare features for ML model
-                    features = [
-                        current_hour / 24.0,  # Time of day (0-1)
-                        day_of_week / 7.0,    # Day of week (0-1)
-                        user_context.get('avg_sentiment', 0.0) * 0.5 + 0.5,  # Scale -1..1 to 0..1
-                        user_context.get('recent_activity', 0.5),  # 0-1 scale
-                        user_pref.get('engagement', 0.5)  # User's historical engagement
-                    ]
-                    
-                    # Get prediction from model (probability of positive engagement)
-                    prediction = self.model.predict_proba([features])[0][1]
-                    
-                    # Scale prediction to 0.5-1.5 range to adjust score
-                    ml_weight = 0.5 + prediction  # 0.5-1.5 range
-                    score *= ml_weight
-                    
-                except Exception as e:
-                    # Fallback to base score if model prediction fails
-                    pass
-            
-            # Store recommendation with metadata
-            valid_recs.append({
-                'text': rec_text,
-                'score': score,
-                'category': category,
-                'features': {
-                    'time_of_day': current_hour,
-                    'day_of_week': day_of_week,
-                    'sentiment': user_context.get('avg_sentiment', 0.0),
-                    'recent_activity': user_context.get('recent_activity', 0.5)
-                }
-            })
-        
-        if not valid_recs:
+        sentiment = user_context.get('avg_sentiment', 0.0)
+        recent_activity = user_context.get('recent_activity', 0.5)
+        
+        # Score on coarse (decile) buckets so repeat calls in the same context hit the cache
+        best_text, best_score = self._cached_score_templates(
+            category,
+            current_hour,
+            day_of_week,
+            round(sentiment * 10),
+            round(recent_activity * 10),
+            round(user_pref.get('engagement', 0.5) * 10),
+            self._model_version
+        )
+        
+        if best_text is None:
             return "", 0.0
-            
-        # Sort by score and select top recommendation
-        valid_recs.sort(key=lambda x: x['score'], reverse=True)
-        top_rec = valid_recs[0]
         
         # Store for feedback collection
         self.last_recommendations[category] = {
-            'timestamp': now.isoformat(),
-            'recommendation': top_rec['text'],
-            'score': top_rec['score'],
-            'context': top_rec['features']
+            'timestamp': now.timestamp(),  # epoch seconds
+            'recommendation': best_text,
+            'score': best_score,
+            'context': {
+                'time_of_day': current_hour,
+                'day_of_week': day_of_week,
+                'sentiment': sentiment,
+                'recent_activity': recent_activity
+            }
         }
         
-        return top_rec['text'], top_rec['score']
+        return best_text, best_score
     
-    def generate_daily_tips(self, user_data: Dict) -> List[Dict]:
+    def generate_daily_tips(self, user_data: Dict,
+                            time_ctx: Optional[Tuple[datetime, int, int]] = None) -> List[Dict]:
         """Generate personalized daily wellness tips based on user data."""
         tips = []
+        if time_ctx is None:
+            time_ctx = self._get_time_context()
         
         # Add time-based tip
-        current_hour = datetime.now().hour
+        current_hour = time_ctx[1]
         if 5 <= current_hour < 10:
             tips.append({
                 'text': "Start your day with a short planning session",
@@ -305,7 +477,7 @@ class WellnessRecommender:
         
         # Add activity-based tips
         if user_data.get('hours_since_last_break', 0) > 1:
-            tip, score = self._get_personalized_recommendation('break_reminders', user_data)
+            tip, score = self._get_personalized_recommendation('break_reminders', user_data, time_ctx)
             if tip:
                 tips.append({
                     'text': tip,
@@ -315,7 +487,7 @@ class WellnessRecommender:
         
         # Add journaling prompt if it's been a while since last entry
         if user_data.get('days_since_last_journal', 0) > 2:
-            tip, score = self._get_personalized_recommendation('journaling_prompts', user_data)
+            tip, score = self._get_personalized_recommendation('journaling_prompts', user_data, time_ctx)
             if tip:
                 tips.append({
                     'text': f"Journal Prompt: {tip}",
@@ -325,7 +497,7 @@ class WellnessRecommender:
         
         # Add work-life balance tip
         if user_data.get('work_life_balance_score', 0) < 0.5:
-            tip, score = self._get_personalized_recommendation('work_schedule', user_data)
+            tip, score = self._get_personalized_recommendation('work_schedule', user_data, time_ctx)
             if tip:
                 tips.append({
                     'text': f"Work-Life Tip: {tip}",
@@ -335,6 +507,23 @@ class WellnessRecommender:
         
         return tips
     
+    def generate_daily_tips_batch(self, users_data: List[Dict]) -> List[List[Dict]]:
+        """Generate daily tips for many users against one clock reading.
+        
+        Tips are generated once per distinct combination of the inputs that
+        drive them and shared between users; results line up with users_data.
+        """
+        time_ctx = self._get_time_context()
+        tips_by_inputs = {}
+        results = []
+        for user_data in users_data:
+            key = tuple(user_data.get(field) for field in _TIP_INPUT_FIELDS)
+            tips = tips_by_inputs.get(key)
+            if tips is None:
+                tips = tips_by_inputs[key] = self.generate_daily_tips(user_data, time_ctx)
+            results.append(tips)
+        return results
+    
     def analyze_burnout_risk(self, git_data: Dict, journal_data: Dict) -> Dict:
         """Analyze burnout risk based on git activity and journal entries."""
         risk_score = self._calculate_burnout_risk_score(git_data, journal_data)
@@ -365,67 +554,8 @@ class WellnessRecommender:
     
     def suggest_interventions(self, risk_level: str, user_preferences: Dict) -> List[Dict]:
         """Suggest interventions based on burnout risk level and user preferences."""
-        interventions = []
-        
-        if risk_level == 'high':
-            interventions.extend([
-                {
-                    'type': 'immediate_break',
-                    'title': 'Take an Immediate Break',
-                    'description': 'Step away from work for at least 30 minutes. Take a walk outside if possible.',
-                    'priority': 'critical'
-                },
-                {
-                    'type': 'schedule_review',
-                    'title': 'Schedule Time Off',
-                    'description': 'Plan at least 1-2 days off in the next week to recover.',
-                    'priority': 'high'
-                },
-                {
-                    'type': 'professional_help',
-                    'title': 'Consider Professional Support',
-                    'description': 'Speak with a mental health professional about stress management.',
-                    'priority': 'high'
-                }
-            ])
-        elif risk_level == 'moderate':
-            interventions.extend([
-                {
-                    'type': 'microbreaks',
-                    'title': 'Schedule Regular Microbreaks',
-                    'description': 'Take 5-minute breaks every 50 minutes to stretch and rest your eyes.',
-                    'priority': 'medium'
-                },
-                {
-                    'type': 'workload_review',
-                    'title': 'Review Workload',
-                    'description': 'Identify tasks that can be delegated or postponed.',
-                    'priority': 'medium'
-                },
-                {
-                    'type': 'mindfulness',
-                    'title': 'Practice Mindfulness',
-                    'description': 'Try a 5-minute guided meditation to reduce stress.',
-                    'priority': 'medium'
-                }
-            ])
-        else:  # low risk
-            interventions.extend([
-                {
-                    'type': 'preventive_breaks',
-                    'title': 'Maintain Healthy Habits',
-                    'description': 'Continue taking regular breaks and maintaining work-life balance.',
-                    'priority': 'low'
-                },
-                {
-                    'type': 'self_reflection',
-                    'title': 'Reflect on Well-being',
-                    'description': 'Journal about your current work habits and well-being.',
-                    'priority': 'low'
-                }
-            ])
-        
-        return interventions
+        rows = _INTERVENTIONS.get(risk_level, _INTERVENTIONS['low'])
+        return [dict(zip(_INTERVENTION_FIELDS, row)) for row in rows]
     
     def get_work_life_balance_tips(self, commit_patterns: Dict) -> List[Dict]:
         """Generate work-life balance tips based on commit patterns."""
@@ -464,8 +594,6 @@ class WellnessRecommender:
             })
         
         return tips
-        
-        return random.choice(recommendations)
     
     def get_journal_insights(self, journal_entries):
         """Generate insights from journal entries."""
@@ -473,20 +601,31 @@ class WellnessRecommender:
             return None
             
         # Simple sentiment analysis (in a real app, you might use the sentiment analyzer)
-        positive_entries = [e for e in journal_entries if e.get('sentiment_score', 0) > 0.2]
-        negative_entries = [e for e in journal_entries if e.get('sentiment_score', 0) < -0.2]
+        # and entry-time totals, gathered in a single pass over the entries
+        positive_count = negative_count = 0
+        entry_hour_total = entry_hour_count = 0
+        for e in journal_entries:
+            score = e.get('sentiment_score', 0)
+            if score > 0.2:
+                positive_count += 1
+            elif score < -0.2:
+                negative_count += 1
+            
+            created_at = e.get('created_at')
+            if created_at:
+                entry_hour_total += created_at.hour
+                entry_hour_count += 1
         
         insights = []
         
-        if len(positive_entries) > len(negative_entries) * 2:
+        if positive_count > negative_count * 2:
             insights.append("Your recent journal entries have been mostly positive. Keep up the good work!")
-        elif len(negative_entries) > len(positive_entries):
+        elif negative_count > positive_count:
             insights.append("You've had some challenging days recently. Remember to take care of yourself.")
         
         # Look for patterns in entry times
-        entry_times = [e.get('created_at').hour for e in journal_entries if e.get('created_at')]
-        if entry_times:
-            avg_entry_hour = sum(entry_times) / len(entry_times)
+        if entry_hour_count:
+            avg_entry_hour = entry_hour_total / entry_hour_count
             if avg_entry_hour > 20:
                 insights.append("You often journal in the evening. This can be a great way to reflect on your day.")
             elif avg_entry_hour < 10:
@@ -495,21 +634,8 @@ class WellnessRecommender:
         return insights if insights else None
     
     def get_daily_wellness_plan(self):
-        """Generate a daily wellness plan."""
-        return {
-            'morning': [
-                "Start with 5 minutes of stretching or light exercise",
-                "Set 3 main goals for the day",
-                "Eat a healthy breakfast"
-            ],
-            'work_session': [
-                "Use the Pomodoro technique (25 min work, 5 min break)",
-                "Take a short walk after completing each major task",
-                "Stay hydrated and take regular screen breaks"
-            ],
-            'evening': [
-                "Reflect on 3 things that went well today",
-                "Disconnect from screens 30 minutes before bed",
-                "Prepare for tomorrow by reviewing your schedule"
-            ]
-        }
+        """Generate a daily wellness plan.
+        
+        Returns the shared read-only plan; copy it before modifying.
+        """
+        return _DAILY_PLAN
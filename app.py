@@ -2,9 +2,10 @@ from flask import Flask
 from flask_wtf import CSRFProtect
 import os
 from config import Config
-from extensions import db, login_manager, migrate, cache, mail
+from extensions import db, login_manager, migrate, cache, mail, init_embeddings
 from utils.filters import register_filters
 from flask_compress import Compress
+from jinja2 import FileSystemBytecodeCache
 
 compress = Compress()
 
@@ -16,30 +17,40 @@ def create_app():
     csrf = CSRFProtect(app)
     mail.init_app(app)
     cache.init_app(app)
-
-    @app.template_filter("format_datetime")
-    def format_datetime(value, format="short"):
-        if format == "short":
-            return value.strftime("%Y-%m-%d %H:%M")
-        elif format == "long":
-            return value.strftime("%A, %d %B %Y at %I:%M%p")
-        return value.strftime("%Y-%m-%d")
+    init_embeddings(app)
 
     # Initialize extensions
     db.init_app(app)
     login_manager.init_app(app)
-    migrate.init_app(app, db)  # Initialize Flask-Migrate
+    # Initialize Flask-Migrate; batch mode lets autogenerated migrations alter SQLite tables
+    migrate.init_app(app, db, render_as_batch=True)
 
     # Register custom template filters
     register_filters(app)
 
+    bytecode_dir = app.config.get("JINJA_BYTECODE_CACHE_DIR")
+    if bytecode_dir:
+        os.makedirs(bytecode_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(bytecode_dir)
+
+    # Compile the email templates now so the first notification run doesn't pay for it
+    from utils.notifications import preload_email_templates
+    preload_email_templates(app)
+
+    # Load the wellness model once; recommenders built per request share it
+    # (see extensions.new_wellness_recommender)
+    from ai_services.wellness_recommender import WellnessRecommender
+    model_path = os.path.join(app.root_path, 'models', 'wellness_model.joblib')
+    app.logger.debug("wellness model path: %s", model_path)
+    app.extensions['wellness_model'] = WellnessRecommender.load_model(model_path)
+
     # Import User model here to avoid circular imports
     from models.user import User
 
     # Configure login manager
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return db.session.get(User, int(user_id))
 
     # Register blueprints
     from routes.auth import auth_bp
@@ -54,9 +65,14 @@ def create_app():
     app.register_blueprint(repository_bp, url_prefix="/repository")
     app.register_blueprint(assistant_bp)  # already has /assistant prefix
 
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    # The schema is managed by the migrations in migrations/, applied by
+    # `flask init-db` (or `flask db upgrade`), not on every boot
+    @app.cli.command("init-db")
+    def init_db():
+        """Create or upgrade the database tables to the latest migration."""
+        from flask_migrate import upgrade
+        upgrade()
+        print("Database is up to date.")
 
     return app
 
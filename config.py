@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 
@@ -20,8 +21,16 @@ class Config:
     UPLOAD_FOLDER = os.path.join(basedir, "static", "uploads")
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
 
+    # Compiled Jinja templates persist here across worker restarts
+    JINJA_BYTECODE_CACHE_DIR = os.getenv("JINJA_BYTECODE_CACHE_DIR") or os.path.join(
+        tempfile.gettempdir(), "devwell-jinja"
+    )
+
     # AI Model Configuration
     MODEL_CACHE_DIR = os.path.join(basedir, "ai_models")
+    # Off by default so CLI commands (init-db, db upgrade) don't load torch;
+    # enable it for the long-running server process
+    PRELOAD_EMBEDDINGS = os.getenv("PRELOAD_EMBEDDINGS", "0") == "1"
 
     MAIL_SERVER = os.getenv("MAIL_SERVER")
     MAIL_PORT = os.getenv("MAIL_PORT")
@@ -30,6 +39,8 @@ class Config:
     MAIL_USERNAME = os.getenv("MAIL_USERNAME")
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER")
+    # Notification emails sent per SMTP session; relays often cap messages per connection
+    MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", "100"))
 
     @staticmethod
     def init_app(app):
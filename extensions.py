@@ -3,7 +3,9 @@ from flask_login import LoginManager
 from flask_migrate import Migrate
 from flask_mail import Mail
 from flask_caching import Cache
+from flask import current_app
 from functools import lru_cache
+import os
 
 # Initialize extensions
 db = SQLAlchemy()
@@ -16,4 +18,32 @@ cache = Cache(config={'CACHE_TYPE': 'SimpleCache'})
 @lru_cache(maxsize=1)
 def get_embeddings_model():
     from langchain_community.embeddings import SentenceTransformerEmbeddings
-    return SentenceTransformerEmbeddings(model_name="all-MiniLM-L6-v2")
\ No newline at end of file
+    # Encode in batches of 64 so bulk reindexing amortizes per-call overhead
+    return SentenceTransformerEmbeddings(
+        model_name="all-MiniLM-L6-v2",
+        encode_kwargs={"batch_size": 64},
+    )
+
+@lru_cache(maxsize=1)
+def get_llm():
+    """Return the process-wide chat model for the assistant (Gemini when configured)."""
+    gemini_key = os.getenv("GEMINI_API_KEY")
+    if gemini_key:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=gemini_key, temperature=0.3)
+    from langchain_community.chat_models import ChatOpenAI
+    return ChatOpenAI(model="gpt-3.5-turbo", temperature=0.3)
+
+def init_embeddings(app):
+    """Load the embeddings model at startup so the first assistant request doesn't pay for it."""
+    if app.config.get("PRELOAD_EMBEDDINGS"):
+        get_embeddings_model()
+
+def new_wellness_recommender():
+    """Return a WellnessRecommender around the app's shared wellness model.
+    
+    Recommenders hold per-user feedback and last recommendations, so each
+    request or job builds its own; only the loaded model is shared.
+    """
+    from ai_services.wellness_recommender import WellnessRecommender
+    return WellnessRecommender(model=current_app.extensions['wellness_model'])
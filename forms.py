@@ -19,6 +19,7 @@ from wtforms.validators import (
 from models.user import User
 from models.repository import Repository
 from models.journal import JournalEntry
+from extensions import db
 
 
 class LoginForm(FlaskForm):
@@ -75,12 +76,14 @@ class RepositoryForm(FlaskForm):
         super().__init__(*args, **kwargs)
         self.current_user = current_user
 
+        # Repository being edited, fetched once for all field validators
+        self._existing = None
+        if self.repo_id.data and str(self.repo_id.data).isdigit():
+            self._existing = db.session.get(Repository, int(self.repo_id.data))
+
     def validate_name(self, name):
         # Skip validation for existing repository being edited
-        if (
-            self.repo_id.data
-            and str(Repository.query.get(self.repo_id.data).id) == self.repo_id.data
-        ):
+        if self._existing is not None:
             return
 
         repo = Repository.query.filter_by(
@@ -94,10 +97,7 @@ class RepositoryForm(FlaskForm):
 
     def validate_repo_url(self, repo_url):
         # Skip validation for existing repository being edited
-        if (
-            self.repo_id.data
-            and str(Repository.query.get(self.repo_id.data).id) == self.repo_id.data
-        ):
+        if self._existing is not None:
             return
 
         repo = Repository.query.filter_by(
@@ -0,0 +1,28 @@
+"""rebuild repository chart data
+
+Charts stored straight after an analysis missed the int-keyed hour and day
+distributions and came out as zeros. Clearing chart_data makes the
+repository page rebuild it from analysis_summary.
+
+Revision ID: 517ea84888f0
+Revises: c2048abe60b1
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '517ea84888f0'
+down_revision = 'c2048abe60b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("UPDATE repositories SET chart_data = NULL")
+
+
+def downgrade():
+    pass
@@ -0,0 +1,111 @@
+"""JSON analysis columns, commit totals, snapshot details, notification timestamps,
+uniqueness constraints and lookup indexes
+
+Revision ID: c2048abe60b1
+Revises: e5b563a72208
+Create Date: 2026-10-15 09:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'c2048abe60b1'
+down_revision = 'e5b563a72208'
+branch_labels = None
+depends_on = None
+
+_JSON = sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql')
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('notifications_enabled', sa.Boolean(),
+                                      server_default=sa.true(), nullable=False))
+        batch_op.add_column(sa.Column('last_daily_tip_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('last_burnout_check_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('journal_entries', schema=None) as batch_op:
+        batch_op.create_index('ix_journal_entries_user_created', ['user_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_journal_entries_user_sentiment', ['user_id', 'sentiment_label'], unique=False)
+
+    # analysis_summary held json.dumps() text; SQLite stores JSON as text already
+    if dialect == 'postgresql':
+        op.alter_column('repositories', 'analysis_summary',
+                        existing_type=sa.Text(),
+                        type_=postgresql.JSONB(astext_type=sa.Text()),
+                        postgresql_using="NULLIF(analysis_summary, '')::jsonb")
+    elif dialect != 'sqlite':
+        op.alter_column('repositories', 'analysis_summary',
+                        existing_type=sa.Text(),
+                        type_=sa.JSON())
+
+    with op.batch_alter_table('repositories', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('chart_data', _JSON, nullable=True))
+        batch_op.add_column(sa.Column('commit_count', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('lines_added_total', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('lines_removed_total', sa.Integer(), nullable=True))
+        batch_op.create_unique_constraint('uq_repo_user_name', ['user_id', 'name'])
+        batch_op.create_unique_constraint('uq_repo_user_url', ['user_id', 'repo_url'])
+        batch_op.create_index('ix_repositories_user_last_commit', ['user_id', 'last_commit_date'], unique=False)
+
+    # Fill the commit totals for repositories imported before they existed
+    op.execute(
+        "UPDATE repositories SET "
+        "commit_count = (SELECT COUNT(*) FROM commits WHERE commits.repository_id = repositories.id), "
+        "lines_added_total = (SELECT COALESCE(SUM(lines_added), 0) FROM commits "
+        "WHERE commits.repository_id = repositories.id), "
+        "lines_removed_total = (SELECT COALESCE(SUM(lines_removed), 0) FROM commits "
+        "WHERE commits.repository_id = repositories.id)"
+    )
+
+    with op.batch_alter_table('commits', schema=None) as batch_op:
+        batch_op.create_index('ix_commits_repo_ts', ['repository_id', 'timestamp'], unique=False)
+
+    with op.batch_alter_table('wellness_snapshots', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('wellness_details', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        batch_op.create_unique_constraint('uq_snapshot_user_date', ['user_id', 'snapshot_date'])
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    with op.batch_alter_table('wellness_snapshots', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_snapshot_user_date', type_='unique')
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('wellness_details')
+
+    with op.batch_alter_table('commits', schema=None) as batch_op:
+        batch_op.drop_index('ix_commits_repo_ts')
+
+    with op.batch_alter_table('repositories', schema=None) as batch_op:
+        batch_op.drop_index('ix_repositories_user_last_commit')
+        batch_op.drop_constraint('uq_repo_user_url', type_='unique')
+        batch_op.drop_constraint('uq_repo_user_name', type_='unique')
+        batch_op.drop_column('lines_removed_total')
+        batch_op.drop_column('lines_added_total')
+        batch_op.drop_column('commit_count')
+        batch_op.drop_column('chart_data')
+
+    if dialect == 'postgresql':
+        op.alter_column('repositories', 'analysis_summary',
+                        existing_type=postgresql.JSONB(astext_type=sa.Text()),
+                        type_=sa.Text(),
+                        postgresql_using='analysis_summary::text')
+    elif dialect != 'sqlite':
+        op.alter_column('repositories', 'analysis_summary',
+                        existing_type=sa.JSON(),
+                        type_=sa.Text())
+
+    with op.batch_alter_table('journal_entries', schema=None) as batch_op:
+        batch_op.drop_index('ix_journal_entries_user_sentiment')
+        batch_op.drop_index('ix_journal_entries_user_created')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('last_burnout_check_at')
+        batch_op.drop_column('last_daily_tip_at')
+        batch_op.drop_column('notifications_enabled')
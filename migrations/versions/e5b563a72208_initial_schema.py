@@ -0,0 +1,115 @@
+"""initial schema
+
+Revision ID: e5b563a72208
+Revises:
+Create Date: 2026-10-15 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b563a72208'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=64), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('password_hash', sa.String(length=256), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('confirmed', sa.Boolean(), nullable=True),
+    sa.Column('confirmed_on', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_users_username'), ['username'], unique=True)
+
+    op.create_table('journal_entries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('sentiment_score', sa.Float(), nullable=True),
+    sa.Column('sentiment_label', sa.String(length=20), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('repositories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('repo_url', sa.String(length=500), nullable=False),
+    sa.Column('local_path', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_commit_date', sa.DateTime(), nullable=True),
+    sa.Column('last_analyzed', sa.DateTime(), nullable=True),
+    sa.Column('analysis_summary', sa.Text(), nullable=True),
+    sa.Column('commit_frequency', sa.Float(), nullable=True),
+    sa.Column('avg_sentiment', sa.Float(), nullable=True),
+    sa.Column('burnout_risk', sa.Float(), nullable=True),
+    sa.Column('total_commits', sa.Integer(), nullable=True),
+    sa.Column('total_authors', sa.Integer(), nullable=True),
+    sa.Column('last_analysis_status', sa.String(length=20), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('wellness_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('snapshot_date', sa.Date(), nullable=False),
+    sa.Column('weekly_hours', sa.Float(), nullable=True),
+    sa.Column('avg_daily_commits', sa.Float(), nullable=True),
+    sa.Column('schedule_regularity', sa.Float(), nullable=True),
+    sa.Column('collaboration_score', sa.Float(), nullable=True),
+    sa.Column('late_night_commits', sa.Integer(), nullable=True),
+    sa.Column('weekend_commit_ratio', sa.Float(), nullable=True),
+    sa.Column('max_commit_streak_hours', sa.Float(), nullable=True),
+    sa.Column('avg_sentiment', sa.Float(), nullable=True),
+    sa.Column('entry_count', sa.Integer(), nullable=True),
+    sa.Column('days_since_last_journal', sa.Integer(), nullable=True),
+    sa.Column('wellness_score', sa.Float(), nullable=True),
+    sa.Column('burnout_risk', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('wellness_snapshots', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_wellness_snapshots_snapshot_date'), ['snapshot_date'], unique=False)
+
+    op.create_table('commits',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('commit_hash', sa.String(length=100), nullable=False),
+    sa.Column('author', sa.String(length=200), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('lines_added', sa.Integer(), nullable=True),
+    sa.Column('lines_removed', sa.Integer(), nullable=True),
+    sa.Column('repository_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['repository_id'], ['repositories.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('commits')
+    with op.batch_alter_table('wellness_snapshots', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_wellness_snapshots_snapshot_date'))
+
+    op.drop_table('wellness_snapshots')
+    op.drop_table('repositories')
+    op.drop_table('journal_entries')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_username'))
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
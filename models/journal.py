@@ -1,8 +1,12 @@
 from datetime import datetime
-from app import db
+from extensions import db
 
 class JournalEntry(db.Model):
     __tablename__ = 'journal_entries'
+    __table_args__ = (
+        db.Index('ix_journal_entries_user_created', 'user_id', 'created_at'),
+        db.Index('ix_journal_entries_user_sentiment', 'user_id', 'sentiment_label'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
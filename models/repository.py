@@ -1,8 +1,17 @@
 from datetime import datetime
-from app import db
+from sqlalchemy.dialects.postgresql import JSONB
+from extensions import db
+
+# Native JSON column; JSONB on PostgreSQL
+_JSON = db.JSON().with_variant(JSONB(), 'postgresql')
 
 class Repository(db.Model):
     __tablename__ = 'repositories'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'name', name='uq_repo_user_name'),
+        db.UniqueConstraint('user_id', 'repo_url', name='uq_repo_user_url'),
+        db.Index('ix_repositories_user_last_commit', 'user_id', 'last_commit_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
@@ -14,7 +23,8 @@ class Repository(db.Model):
     
     # Analysis fields
     last_analyzed = db.Column(db.DateTime)
-    analysis_summary = db.Column(db.Text)  # Stores JSON string of analysis results
+    analysis_summary = db.Column(_JSON)  # Analysis results from GitAnalyzer
+    chart_data = db.Column(_JSON)  # Chart-ready arrays derived from analysis_summary
     commit_frequency = db.Column(db.Float)  # Commits per day
     avg_sentiment = db.Column(db.Float)    # Average sentiment score (-1 to 1)
     burnout_risk = db.Column(db.Float)      # 0-1 scale
@@ -22,11 +32,18 @@ class Repository(db.Model):
     total_authors = db.Column(db.Integer)   # Number of unique authors
     last_analysis_status = db.Column(db.String(20))  # 'pending', 'completed', 'failed'
     
+    # Totals over the imported Commit rows, refreshed after each commit import
+    commit_count = db.Column(db.Integer)
+    lines_added_total = db.Column(db.Integer)
+    lines_removed_total = db.Column(db.Integer)
+    
     # Foreign Keys
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
-    # Relationships
-    commits = db.relationship('Commit', backref='repository', lazy='dynamic')
+    # Relationships (loaded as a plain list so it can be eager-loaded in bulk;
+    # use commits_query() to filter or stream without loading the collection)
+    commits = db.relationship('Commit', backref='repository', lazy='select',
+                              order_by='Commit.timestamp')
     
     def __init__(self, name, repo_url, user_id, description=None, local_path=None, last_commit_date=None):
         self.name = name
@@ -36,11 +53,18 @@ class Repository(db.Model):
         self.local_path = local_path
         self.last_commit_date = last_commit_date
     
+    def commits_query(self):
+        """Return a query over this repository's commits."""
+        return Commit.query.filter_by(repository_id=self.id)
+    
     def __repr__(self):
         return f'<Repository {self.name}>'
 
 class Commit(db.Model):
     __tablename__ = 'commits'
+    __table_args__ = (
+        db.Index('ix_commits_repo_ts', 'repository_id', 'timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     commit_hash = db.Column(db.String(100), nullable=False)
@@ -2,6 +2,7 @@ from datetime import datetime
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from extensions import db
+from utils.token import generate_unsubscribe_token
 
 
 class User(UserMixin, db.Model):
@@ -16,6 +17,13 @@ class User(UserMixin, db.Model):
     confirmed = db.Column(db.Boolean, default=False)
     confirmed_on = db.Column(db.DateTime)
 
+    # Wellness emails go to confirmed users who haven't unsubscribed
+    notifications_enabled = db.Column(db.Boolean, default=True, server_default=db.true(), nullable=False)
+
+    # Notification bookkeeping, written in bulk by schedule_wellness_notifications
+    last_daily_tip_at = db.Column(db.DateTime)
+    last_burnout_check_at = db.Column(db.DateTime)
+
     # Relationships
     journal_entries = db.relationship("JournalEntry", backref="author", lazy="dynamic")
     repositories = db.relationship("Repository", backref="owner", lazy="dynamic")
@@ -28,5 +36,9 @@ class User(UserMixin, db.Model):
     def verify_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+    def get_email_unsubscribe_token(self):
+        """Token for the unsubscribe link in notification emails."""
+        return generate_unsubscribe_token(self.id)
+
     def __repr__(self):
         return f"<User {self.username}>"
@@ -1,8 +1,11 @@
-from datetime import date
+from datetime import date, datetime
 from extensions import db
 
 class WellnessSnapshot(db.Model):
     __tablename__ = 'wellness_snapshots'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'snapshot_date', name='uq_snapshot_user_date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -26,6 +29,10 @@ class WellnessSnapshot(db.Model):
     wellness_score = db.Column(db.Float)
     burnout_risk = db.Column(db.Float)
 
+    # JSON blob of the tips and burnout analysis shown on the dashboard
+    wellness_details = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
     def to_summary(self):
         return (
             f"Snapshot {self.snapshot_date} – wellness {self.wellness_score}, "
@@ -1,99 +1,265 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
 # from langchain.chat_models import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
-#from langchain_community.embeddings import SentenceTransformerEmbeddings
-from langchain_community.vectorstores import Chroma
-from langchain.schema import Document
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
+# LangChain, Chroma and Google GenAI are imported inside the functions that use them,
+# so app startup and CLI commands don't pay for them until the assistant is used
 
 from models.journal import JournalEntry
 from models.repository import Commit, Repository
 from models.wellness_snapshot import WellnessSnapshot
 from datetime import datetime, timedelta
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import blake2b
+import numpy as np
+import json
 import os
-from extensions import get_embeddings_model, cache
+import threading
+import uuid
+from extensions import db, cache, get_embeddings_model, get_llm
+from functools import lru_cache
 
 assistant_bp = Blueprint('assistant', __name__, url_prefix='/assistant')
 
 VECTOR_DIR = os.path.join(os.getcwd(), 'vector_stores')
 
+# Rows fetched from the DB and documents embedded per round trip during reindex
+_REINDEX_BATCH_SIZE = 1000
 
-def _get_vectordb(user_id: int):
-    """Return (or create) the Chroma vector store for the user."""
-    user_dir = os.path.join(VECTOR_DIR, str(user_id))
-    os.makedirs(user_dir, exist_ok=True)
-    embeddings = cache.get('embeddings_model') or get_embeddings_model()
-    return Chroma(persist_directory=user_dir, embedding_function=embeddings)
+# Custom prompt to encourage grounded answers
+QA_PROMPT_TEMPLATE = (
+    "You are DevWell Assistant, an AI helping a developer reflect on their activity. "
+    "Use ONLY the information in the context below to answer the question. "
+    "If the context is empty or insufficient, reply with 'I don't have enough information from your recent activity to answer that.'\n\n"
+    "Context:\n{context}\n\nQuestion: {question}\nAnswer:"
+)
 
-def _build_documents(user_id: int):
-    """Gather commits, journals, repositories, and wellness snapshots into LangChain Documents."""
-    docs = []
+# Answers to repeated questions are served from cache for this long (seconds)
+_CHAT_CACHE_TIMEOUT = 3600
+
+# Reindexing runs off the request thread; only the latest job per user is tracked
+_reindex_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='reindex')
+_reindex_jobs = {}  # user_id -> (job_id, future)
+
+# Open Chroma handles per (user_id, pid) so requests don't reopen the store, as
+# (generation, handle). Request threads and reindex jobs share them, so opening
+# and wiping happen under the lock; a reindex in another worker process changes
+# the store's generation, which reopens the handle here.
+_vectordbs = {}
+_vectordbs_lock = threading.RLock()
+
+# Content hash -> (int8 vector, scale), least recently used evicted first.
+# Symmetric per-vector int8 keeps each MiniLM vector at 384 bytes instead of 1.5KB.
+_EMBEDDING_CACHE_SIZE = 80000
+_embedding_cache = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+
+def _quantize(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    scale = float(np.abs(vector).max()) / 127.0 or 1.0
+    return np.round(vector / scale).astype(np.int8), scale
+
+
+def _dequantize(entry):
+    values, scale = entry
+    return (values.astype(np.float32) * scale).tolist()
+
+
+def _get_vectordb(user_id: int, generation=None):
+    """Return (or create) the Chroma vector store for the user.
+
+    `generation` is the store's current _store_generation(), read here when omitted.
+    """
+    key = (user_id, os.getpid())
+    if generation is None:
+        generation = _store_generation(user_id)
+    entry = _vectordbs.get(key)
+    if entry is None or entry[0] != generation:
+        from langchain_community.vectorstores import Chroma
+        with _vectordbs_lock:
+            entry = _vectordbs.get(key)
+            if entry is None or entry[0] != generation:
+                user_dir = os.path.join(VECTOR_DIR, str(user_id))
+                os.makedirs(user_dir, exist_ok=True)
+                vectordb = Chroma(persist_directory=user_dir, embedding_function=get_embeddings_model())
+                entry = _vectordbs[key] = (generation, vectordb)
+    return entry[1]
+
+def _content_hash(text: str) -> str:
+    return blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _embed_documents(docs, hashes):
+    """Return embeddings for the documents, only running the model on uncached content."""
+    entries = {}
+    missing = {}
+    with _embedding_cache_lock:
+        for doc, h in zip(docs, hashes):
+            if h in _embedding_cache:
+                _embedding_cache.move_to_end(h)
+                entries[h] = _embedding_cache[h]
+            else:
+                missing.setdefault(h, doc.page_content)
+
+    if missing:
+        vectors = get_embeddings_model().embed_documents(list(missing.values()))
+        for h, vector in zip(missing, vectors):
+            entries[h] = _quantize(vector)
+        with _embedding_cache_lock:
+            for h in missing:
+                _embedding_cache[h] = entries[h]
+            while len(_embedding_cache) > _EMBEDDING_CACHE_SIZE:
+                _embedding_cache.popitem(last=False)
+
+    return [_dequantize(entries[h]) for h in hashes]
+
+
+@lru_cache(maxsize=1)
+def _get_qa_prompt():
+    from langchain.prompts import PromptTemplate
+    return PromptTemplate(input_variables=["context", "question"], template=QA_PROMPT_TEMPLATE)
+
+
+def _watermark_path(user_id: int) -> str:
+    return os.path.join(VECTOR_DIR, str(user_id), '.watermark')
+
+
+def _store_generation(user_id: int):
+    """Identify the current build of the user's store; every finished reindex, in any
+    process, rewrites the watermark and so changes it. None before the first reindex."""
+    try:
+        return os.stat(_watermark_path(user_id)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_watermark(user_id: int):
+    """Return the last successful reindex watermark for the user, or None."""
+    try:
+        with open(_watermark_path(user_id)) as f:
+            data = json.load(f)
+        return {'at': datetime.fromisoformat(data['at']), 'commit_id': data['commit_id']}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_watermark(user_id: int, at: datetime, commit_id: int):
+    path = _watermark_path(user_id)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'at': at.isoformat(), 'commit_id': commit_id}, f)
+    os.replace(tmp_path, path)
+
+
+def _iter_documents(user_id: int, watermark=None):
+    """Stream commits, journals, repositories, and wellness snapshots as LangChain Documents.
+
+    Yields (doc_id, Document) pairs where doc_id is stable per source row. With a watermark,
+    only rows added or changed since that reindex are produced.
+    """
+    from langchain.schema import Document
 
     since = datetime.utcnow() - timedelta(days=90)
 
-    # Commits
-    commits = (
-        Commit.query.join(Repository)
+    # Commits, fetched as plain column tuples in batches rather than ORM objects
+    commits_query = (
+        db.session.query(Commit.id, Commit.message, Commit.timestamp, Repository.name)
+        .join(Repository)
         .filter(Repository.user_id == user_id, Commit.timestamp >= since)
-        .all()
     )
-    for c in commits:
-        docs.append(
-            Document(
-                page_content=f"[{c.repository.name}] {c.message}",
-                metadata={
-                    "type": "commit",
-                    "repo": c.repository.name if c.repository else "unknown",
-                    "timestamp": c.timestamp.isoformat(),
-                },
-            )
+    if watermark:
+        # Commit timestamps are author times, so new rows are found by id instead
+        commits_query = commits_query.filter(Commit.id > watermark['commit_id'])
+    for commit_id, message, timestamp, repo_name in commits_query.yield_per(_REINDEX_BATCH_SIZE):
+        yield f"commit:{commit_id}", Document(
+            page_content=f"[{repo_name}] {message}",
+            metadata={
+                "type": "commit",
+                "repo": repo_name,
+                "timestamp": timestamp.isoformat(),
+            },
         )
 
     # Journal entries
-    entries = (
-        JournalEntry.query.filter_by(user_id=user_id)
-        .filter(JournalEntry.created_at >= since)
-        .all()
+    entries_query = (
+        db.session.query(
+            JournalEntry.id, JournalEntry.title, JournalEntry.content,
+            JournalEntry.created_at, JournalEntry.sentiment_label,
+        )
+        .filter(JournalEntry.user_id == user_id, JournalEntry.created_at >= since)
     )
-    for e in entries:
-        docs.append(
-            Document(
-                page_content=e.content,
-                metadata={
-                    "type": "journal",
-                    "title": e.title,
-                    "timestamp": e.created_at.isoformat(),
-                    "sentiment": e.sentiment_label or "neutral"
-                },
-            )
+    if watermark:
+        entries_query = entries_query.filter(JournalEntry.updated_at >= watermark['at'])
+    for e in entries_query.yield_per(_REINDEX_BATCH_SIZE):
+        yield f"journal:{e.id}", Document(
+            page_content=e.content,
+            metadata={
+                "type": "journal",
+                "title": e.title,
+                "timestamp": e.created_at.isoformat(),
+                "sentiment": e.sentiment_label or "neutral"
+            },
         )
 
-    # Wellness Snapshots
-    snapshots = (
-        WellnessSnapshot.query.filter_by(user_id=user_id)
-        .filter(WellnessSnapshot.snapshot_date >= since.date())
-        .order_by(WellnessSnapshot.snapshot_date.desc())
+    # Wellness Snapshots, rolled up into one document per week on the DB side
+    # (weeks start on Monday so the incremental window always covers whole weeks)
+    snapshots_since = since.date()
+    if watermark:
+        # Today's snapshot is rewritten in place, so re-send the watermark's week too
+        snapshots_since = max(snapshots_since, watermark['at'].date())
+    snapshots_since -= timedelta(days=snapshots_since.weekday())
+
+    if db.engine.dialect.name == 'sqlite':
+        week = db.func.strftime('%Y-%W', WellnessSnapshot.snapshot_date)
+    else:
+        week = db.func.to_char(WellnessSnapshot.snapshot_date, 'IYYY-IW')
+    weeks = (
+        db.session.query(
+            week.label('week'),
+            db.func.min(WellnessSnapshot.snapshot_date).label('week_start'),
+            db.func.avg(WellnessSnapshot.wellness_score).label('wellness_score'),
+            db.func.avg(WellnessSnapshot.burnout_risk).label('burnout_risk'),
+            db.func.avg(WellnessSnapshot.avg_sentiment).label('avg_sentiment'),
+            db.func.count(WellnessSnapshot.id).label('snapshots'),
+        )
+        .filter(
+            WellnessSnapshot.user_id == user_id,
+            WellnessSnapshot.snapshot_date >= snapshots_since,
+        )
+        .group_by(week)
+        .order_by(db.func.min(WellnessSnapshot.snapshot_date).desc())
         .all()
     )
-    for snap in snapshots:
-        summary = snap.to_summary()
-        docs.append(
-            Document(
-                page_content=summary,
-                metadata={
-                    "type": "wellness",
-                    "snapshot_date": snap.snapshot_date.isoformat(),
-                    "burnout_risk": snap.burnout_risk,
-                    "wellness_score": snap.wellness_score,
-                },
-            )
+    for wk in weeks:
+        wellness_score = round(wk.wellness_score, 2) if wk.wellness_score is not None else None
+        burnout_risk = round(wk.burnout_risk, 2) if wk.burnout_risk is not None else None
+        avg_sentiment = round(wk.avg_sentiment, 2) if wk.avg_sentiment is not None else None
+        yield f"wellness-week:{wk.week}", Document(
+            page_content=(
+                f"Week of {wk.week_start} ({wk.snapshots} snapshots) – avg wellness {wellness_score}, "
+                f"avg burnout risk {burnout_risk}, avg sentiment {avg_sentiment}."
+            ),
+            metadata={
+                "type": "wellness",
+                "snapshot_date": wk.week_start.isoformat(),
+                "burnout_risk": burnout_risk,
+                "wellness_score": wellness_score,
+            },
         )
 
     # Repository summaries
-    repos = Repository.query.filter_by(user_id=user_id).all()
-    for repo in repos:
+    repos_query = db.session.query(
+        Repository.id, Repository.name, Repository.description, Repository.commit_frequency,
+        Repository.avg_sentiment, Repository.burnout_risk, Repository.total_commits,
+        Repository.total_authors,
+    ).filter(Repository.user_id == user_id)
+    if watermark:
+        repos_query = repos_query.filter(db.or_(
+            Repository.created_at >= watermark['at'],
+            Repository.last_analyzed >= watermark['at'],
+        ))
+    for repo in repos_query.yield_per(_REINDEX_BATCH_SIZE):
         description = repo.description or "No description provided."
         summary = (
             f"Repository: {repo.name}\n"
@@ -104,39 +270,108 @@ def _build_documents(user_id: int):
             f"Total commits: {repo.total_commits}\n"
             f"Authors: {repo.total_authors}"
         )
-        docs.append(
-            Document(
-                page_content=summary,
-                metadata={
-                    "type": "repository",
-                    "repo": repo.name,
-                    "burnout_risk": repo.burnout_risk,
-                    "commit_frequency": repo.commit_frequency,
-                },
-            )
+        yield f"repository:{repo.id}", Document(
+            page_content=summary,
+            metadata={
+                "type": "repository",
+                "repo": repo.name,
+                "burnout_risk": repo.burnout_risk,
+                "commit_frequency": repo.commit_frequency,
+            },
         )
 
-    return docs
 
+def _upsert_documents(vectordb, batch):
+    """Upsert a batch of (doc_id, Document) pairs into the vector store."""
+    ids = [doc_id for doc_id, _ in batch]
+    docs = [doc for _, doc in batch]
+    # Unchanged documents reuse their cached embeddings instead of being re-embedded
+    hashes = [_content_hash(d.page_content) for d in docs]
+    vectordb._collection.upsert(
+        ids=ids,
+        embeddings=_embed_documents(docs, hashes),
+        documents=[d.page_content for d in docs],
+        metadatas=[d.metadata for d in docs],
+    )
+
+
+
+def _do_reindex(app, user_id: int, full: bool = False):
+    """Update the user's vector store with rows changed since the last reindex.
+
+    With full=True (or no watermark yet) the store is wiped and rebuilt, which also
+    drops deleted or aged-out rows. Runs in the reindex executor with its own app context.
+    """
+    with app.app_context():
+        try:
+            started_at = datetime.utcnow()
+            watermark = None if full else _read_watermark(user_id)
+
+            if watermark is None:
+                # Fully remove existing vector store to avoid stale collection errors
+                user_dir = os.path.join(VECTOR_DIR, str(user_id))
+                with _vectordbs_lock:
+                    _vectordbs.pop((user_id, os.getpid()), None)
+                    if os.path.exists(user_dir):
+                        import shutil
+                        shutil.rmtree(user_dir)
+
+            vectordb = _get_vectordb(user_id)
+
+            max_commit_id = db.session.query(db.func.max(Commit.id)).scalar() or 0
+            # Embed and upsert in fixed-size batches so memory stays bounded by the batch
+            indexed = 0
+            batch = []
+            for item in _iter_documents(user_id, watermark):
+                batch.append(item)
+                if len(batch) >= _REINDEX_BATCH_SIZE:
+                    _upsert_documents(vectordb, batch)
+                    indexed += len(batch)
+                    batch = []
+            if batch:
+                _upsert_documents(vectordb, batch)
+                indexed += len(batch)
+            if indexed:
+                vectordb.persist()
+            _write_watermark(user_id, started_at, max_commit_id)
+            return {"documents_indexed": indexed, "full": watermark is None}
+        except Exception as e:
+            app.logger.error(f"Error reindexing vector store for user {user_id}: {str(e)}")
+            raise
 
 
 @assistant_bp.route('/reindex', methods=['POST'])
 @login_required
 def reindex():
-    """Rebuild the user's vector store."""
-    # Fully remove existing vector store to avoid stale collection errors
-    user_dir = os.path.join(VECTOR_DIR, str(current_user.id))
-    if os.path.exists(user_dir):
-        import shutil
-        shutil.rmtree(user_dir)
+    """Queue a reindex of the user's vector store and return its job id.
+
+    Pass ?full=1 to wipe and rebuild the store. A job already running for the user is reused.
+    """
+    job = _reindex_jobs.get(current_user.id)
+    if job is None or job[1].done():
+        app = current_app._get_current_object()
+        future = _reindex_executor.submit(
+            _do_reindex, app, current_user.id, bool(request.args.get('full'))
+        )
+        job = (uuid.uuid4().hex, future)
+        _reindex_jobs[current_user.id] = job
+    return jsonify({"status": "queued", "job_id": job[0]}), 202
 
-    vectordb = _get_vectordb(current_user.id)
 
-    docs = _build_documents(current_user.id)
-    if docs:
-        vectordb.add_documents(docs)
-        vectordb.persist()
-    return jsonify({"status": "ok", "documents_indexed": len(docs)})
+@assistant_bp.route('/reindex/status/<job_id>')
+@login_required
+def reindex_status(job_id):
+    """Report the state of the user's latest reindex job."""
+    job = _reindex_jobs.get(current_user.id)
+    if job is None or job[0] != job_id:
+        return jsonify({"error": "unknown job"}), 404
+
+    future = job[1]
+    if not future.done():
+        return jsonify({"status": "running", "job_id": job_id})
+    if future.exception() is not None:
+        return jsonify({"status": "error", "job_id": job_id, "message": str(future.exception())}), 500
+    return jsonify({"status": "ok", "job_id": job_id, **future.result()})
 
 
 @assistant_bp.route('/chat', methods=['POST'])
@@ -146,35 +381,32 @@ def chat():
     if not user_msg:
         return jsonify({"error": "message required"}), 400
 
-    vectordb = _get_vectordb(current_user.id)
+    # Exact-match answer cache keyed on the user, the store generation and the
+    # normalized question; answers only come from the store, so a reindex (which
+    # is what picks up new journal entries and commits) starts a fresh namespace
+    generation = _store_generation(current_user.id)
+    cache_key = f"qa:{current_user.id}:{generation}:{_content_hash(' '.join(user_msg.lower().split()))}"
+    cached_answer = cache.get(cache_key)
+    if cached_answer:
+        return jsonify({"answer": cached_answer})
+
+    from langchain.chains import RetrievalQA
+
+    vectordb = _get_vectordb(current_user.id, generation)
     retriever = vectordb.as_retriever(search_kwargs={"k": 15})
     print("Retrieved documents:", retriever)
 
-    # Set up LLM
-    gemini_key = os.getenv("GEMINI_API_KEY")
-    if gemini_key:
-        llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=gemini_key, temperature=0.3)
-    else:
-        llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0.3)
-
-    # Custom prompt to encourage grounded answers
-    QA_PROMPT = PromptTemplate(
-        input_variables=["context", "question"],
-        template=(
-            "You are DevWell Assistant, an AI helping a developer reflect on their activity. "
-            "Use ONLY the information in the context below to answer the question. "
-            "If the context is empty or insufficient, reply with 'I don't have enough information from your recent activity to answer that.'\n\n"
-            "Context:\n{context}\n\nQuestion: {question}\nAnswer:"),
-    )
-
+    # LLM client and prompt are built once per process and shared across requests
     qa = RetrievalQA.from_chain_type(
-        llm,
+        get_llm(),
         chain_type="stuff",
         retriever=retriever,
-        chain_type_kwargs={"prompt": QA_PROMPT},
+        chain_type_kwargs={"prompt": _get_qa_prompt()},
     )
 
     answer = ""
     answer = qa.run(user_msg)
     print("Answer:", answer)
+    if answer:
+        cache.set(cache_key, answer, timeout=_CHAT_CACHE_TIMEOUT)
     return jsonify({"answer": answer})
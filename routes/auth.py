@@ -11,7 +11,7 @@ from models.user import User
 from extensions import db
 from forms import LoginForm, RegistrationForm
 from utils.email import send_email
-from utils.token import generate_confirmation_token, confirm_token
+from utils.token import generate_confirmation_token, confirm_token, confirm_unsubscribe_token
 from datetime import datetime
 
 # Create blueprint
@@ -99,6 +99,21 @@ def confirm_email(token):
     return redirect(url_for("auth.login"))
 
 
+@auth_bp.route("/unsubscribe/<token>")
+def unsubscribe(token):
+    user_id = confirm_unsubscribe_token(token)
+    if user_id is False:
+        flash("Unsubscribe link is invalid.", "danger")
+        return redirect(url_for("auth.login"))
+
+    user = db.get_or_404(User, user_id)
+    if user.notifications_enabled:
+        user.notifications_enabled = False
+        db.session.commit()
+    flash("You have been unsubscribed from wellness emails.", "success")
+    return redirect(url_for("auth.login"))
+
+
 @auth_bp.route("/logout")
 @login_required
 def logout():
@@ -1,42 +1,98 @@
-from flask import Blueprint, render_template, jsonify, current_app, request
+from flask import Blueprint, render_template, jsonify, request
 from flask_login import login_required, current_user
 from models.journal import JournalEntry
 from models.repository import Repository, Commit
 from models.wellness_snapshot import WellnessSnapshot
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import func, case, extract, or_
+from extensions import db, cache, new_wellness_recommender
+from utils.cache import dashboard_cache_key
 import json
-import os
-
-# Import WellnessRecommender
-from ai_services.wellness_recommender import WellnessRecommender
+import numpy as np
 
 # Create blueprint
 dashboard_bp = Blueprint('dashboard', __name__)
 
+# Dashboard statistics are cached per user; they only change when journal
+# entries or repository analyses land, and those paths invalidate the key
+_DASHBOARD_CACHE_TIMEOUT = 300
+
+# Today's wellness snapshot is recomputed at most this often
+_SNAPSHOT_MAX_AGE = timedelta(hours=1)
+
 @dashboard_bp.route('/dashboard')
 @login_required
 def index():
-    # Get recent journal entries
-    recent_entries = JournalEntry.query\
-        .filter_by(user_id=current_user.id)\
+    # Get recent journal entries; the card shows a 100-character snippet, so
+    # only a 200-character prefix of the content is fetched
+    recent_entries = db.session.query(
+        JournalEntry.id,
+        JournalEntry.title,
+        JournalEntry.created_at,
+        JournalEntry.sentiment_label,
+        func.substr(JournalEntry.content, 1, 200).label('content')
+    ).filter_by(user_id=current_user.id)\
         .order_by(JournalEntry.created_at.desc())\
         .limit(3)\
         .all()
     
-    # Get recent repositories
-    recent_repos = Repository.query\
-        .filter_by(user_id=current_user.id)\
-        .order_by(Repository.created_at.desc())\
-        .limit(3)\
-        .all()
-    
-    # Get repository analysis data
-    repos = Repository.query.filter_by(user_id=current_user.id).all()
+    # Get repository analysis data; only the columns the cards read, so wide
+    # columns such as analysis_summary are never loaded
+    repos = db.session.query(
+        Repository.id,
+        Repository.name,
+        Repository.description,
+        Repository.created_at,
+        Repository.last_analyzed,
+        Repository.burnout_risk
+    ).filter_by(user_id=current_user.id).all()
+
+    # Recent repositories come from the rows already loaded above; the
+    # template only reads scalar columns, so no relationship prefetch is needed
+    recent_repos = sorted(
+        repos,
+        key=lambda r: r.created_at or datetime.min,
+        reverse=True
+    )[:3]
     
+    # Counts, risky repos and activity; the wellness cards are fetched
+    # separately from dashboard.wellness_cards so they don't delay the page
+    cache_key = dashboard_cache_key(current_user.id)
+    stats = cache.get(cache_key)
+    if stats is None:
+        stats = _build_dashboard_stats(repos, datetime.utcnow())
+        cache.set(cache_key, stats, timeout=_DASHBOARD_CACHE_TIMEOUT)
+
+    return render_template(
+        'dashboard.html',
+        recent_entries=recent_entries,
+        recent_repos=recent_repos,
+        stats=stats
+    )
+
+@dashboard_bp.route('/dashboard/wellness')
+@login_required
+def wellness_cards():
+    """Render the wellness score and insights cards for the dashboard to load asynchronously."""
+    cache_key = dashboard_cache_key(current_user.id, 'wellness')
+    wellness = cache.get(cache_key)
+    if wellness is None:
+        wellness = _build_wellness(datetime.utcnow())
+        cache.set(cache_key, wellness, timeout=_DASHBOARD_CACHE_TIMEOUT)
+
+    return jsonify({
+        'score': render_template('components/dashboard_wellness_score.html', wellness=wellness),
+        'insights': render_template('components/dashboard_wellness_insights.html', wellness=wellness)
+    })
+
+def _build_dashboard_stats(repos, now):
+    """Compute the dashboard's repository and journal statistics."""
     # Calculate repository metrics
-    total_commits = sum(repo.total_commits or 0 for repo in repos)
-    total_authors = sum(repo.total_authors or 0 for repo in repos)
+    repo_totals = db.session.query(
+        func.coalesce(func.sum(Repository.total_commits), 0),
+        func.coalesce(func.sum(Repository.total_authors), 0)
+    ).filter(Repository.user_id == current_user.id).one()
+    total_commits, total_authors = repo_totals
     
     # Get repositories with burnout risk (top 3)
     risky_repos = sorted(
@@ -45,51 +101,141 @@ def index():
         reverse=True
     )[:3]
     
-    # Get recent activity from repositories (commits in the last 7 days)
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    recent_activity = []
+    # Get recent activity from repositories (commits in the last 7 days),
+    # newest first, fetching only the two columns the card shows
+    week_ago = now - timedelta(days=7)
+    recent_activity = [{
+        'type': 'commit',
+        'repo': name,
+        'timestamp': last_commit_date,
+        'message': f"New commits in {name}"
+    } for name, last_commit_date in db.session.query(Repository.name, Repository.last_commit_date)
+        .filter(Repository.user_id == current_user.id,
+                Repository.last_commit_date >= week_ago)
+        .order_by(Repository.last_commit_date.desc())
+        .limit(5)]
     
-    for repo in repos:
-        if repo.last_commit_date and repo.last_commit_date >= week_ago:
-            recent_activity.append({
-                'type': 'commit',
-                'repo': repo.name,
-                'timestamp': repo.last_commit_date,
-                'message': f"New commits in {repo.name}"
-            })
-    
-    # Sort by timestamp
-    recent_activity.sort(key=lambda x: x['timestamp'], reverse=True)
+    journal_stats = _journal_stats(now)
+
+    # Get statistics
+    stats = {
+        'total_journals': journal_stats.total_journals,
+        'total_repos': len(repos),
+        'total_commits': total_commits,
+        'total_authors': total_authors,
+        'recent_activity': recent_activity,
+        'risky_repos': [{
+            'id': r.id,
+            'name': r.name,
+            'risk_score': round((r.burnout_risk or 0) * 100, 1),
+            'last_analyzed': r.last_analyzed.strftime('%Y-%m-%d') if r.last_analyzed else 'Never'
+        } for r in risky_repos]
+    }
+
+    return stats
+
+def _journal_stats(now):
+    """All-time count, 30-day sentiment average and entry count, and latest entry timestamps.
     
-    # Get journal sentiment data for wellness analysis
-    journal_sentiment = JournalEntry.query.with_entities(
-        func.avg(JournalEntry.sentiment_score).label('avg_sentiment'),
-        func.count(JournalEntry.id).label('entry_count')
-    ).filter(
-        JournalEntry.user_id == current_user.id,
-        JournalEntry.created_at >= (datetime.utcnow() - timedelta(days=30))
-    ).first()
-
-    # Initialize WellnessRecommender
-    model_path = os.path.join(current_app.root_path, 'models', 'wellness_model.joblib')
-
-    print(model_path)
-    recommender = WellnessRecommender(model_path if os.path.exists(model_path) else None)
+    `last_updated_at` also moves when an entry is edited or its background
+    sentiment analysis lands, neither of which touches `created_at`.
+    """
+    journal_cutoff = now - timedelta(days=30)
+    in_window = JournalEntry.created_at >= journal_cutoff
+    return db.session.query(
+        func.count(JournalEntry.id).label('total_journals'),
+        func.avg(case((in_window, JournalEntry.sentiment_score))).label('avg_sentiment'),
+        func.count(case((in_window, JournalEntry.id))).label('entry_count'),
+        func.max(JournalEntry.created_at).label('last_created_at'),
+        func.max(JournalEntry.updated_at).label('last_updated_at')
+    ).filter(JournalEntry.user_id == current_user.id).one()
+
+def _build_wellness(now):
+    """Return the wellness card data, reusing today's snapshot when it is fresh."""
+    journal_stats = _journal_stats(now)
+    last_analyzed_at = db.session.query(func.max(Repository.last_analyzed))\
+        .filter(Repository.user_id == current_user.id).scalar()
+
+    # Reuse today's snapshot while it is recent and no journal entry (new,
+    # edited or newly scored) or repository analysis has landed since it was written
+    snap = WellnessSnapshot.query.filter_by(user_id=current_user.id, snapshot_date=now.date()).first()
+    last_journal_at = max(filter(None, (journal_stats.last_created_at, journal_stats.last_updated_at)), default=None)
+    if _snapshot_is_fresh(snap, now, last_journal_at, last_analyzed_at):
+        details = json.loads(snap.wellness_details)
+    else:
+        details = _refresh_wellness_snapshot(now, journal_stats)
+
+    wellness_score = details['wellness_score']
+    return {
+        'score': round(wellness_score, 1),
+        'level': 'Excellent' if wellness_score >= 8 else 'Good' if wellness_score >= 6 else 'Needs Attention',
+        'trend': 'up' if wellness_score >= 7 else 'down' if wellness_score <= 5 else 'stable',
+        'burnout_risk': details['burnout_analysis'],
+        'tips': details['wellness_tips'],
+        'work_life_tips': details['work_life_tips']
+    }
+
+def _snapshot_is_fresh(snap, now, last_journal_at, last_analyzed_at):
+    """Return True if a snapshot's stored wellness details can be reused."""
+    if not snap or not snap.wellness_details or not snap.updated_at:
+        return False
+    if snap.updated_at < now - _SNAPSHOT_MAX_AGE:
+        return False
+    if last_journal_at and last_journal_at > snap.updated_at:
+        return False
+    return not (last_analyzed_at and last_analyzed_at > snap.updated_at)
+
+def _upsert_snapshot(user_id, snapshot_date, fields):
+    """Insert or update a user's snapshot for the day, atomically where the database supports it."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(WellnessSnapshot).values(user_id=user_id, snapshot_date=snapshot_date, **fields)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['user_id', 'snapshot_date'],
+            set_=fields
+        ))
+    else:
+        snap = WellnessSnapshot.query.filter_by(user_id=user_id, snapshot_date=snapshot_date).first()
+        if not snap:
+            snap = WellnessSnapshot(user_id=user_id, snapshot_date=snapshot_date)
+        for column, value in fields.items():
+            setattr(snap, column, value)
+        db.session.add(snap)
+    db.session.commit()
+
+def _refresh_wellness_snapshot(now, journal_stats):
+    """Run the git/journal wellness analysis and store it in today's snapshot."""
+    # Recommender for this request around the model loaded by the app factory
+    recommender = new_wellness_recommender()
     
     # Prepare git data for analysis (last 30 days)
     lookback_days = 30
-    since_date = datetime.utcnow() - timedelta(days=lookback_days)
+    since_date = now - timedelta(days=lookback_days)
 
-    commits = (Commit.query
-               .join(Repository)
-               .filter(Repository.user_id == current_user.id,
-                       Commit.timestamp >= since_date)
-               .all())
+    # Per-day aggregates are computed by the database, so Python only sees
+    # one row per active day instead of one row per commit
+    commit_hour = extract('hour', Commit.timestamp)
+    commit_filter = (Repository.user_id == current_user.id,
+                     Commit.timestamp >= since_date)
+    daily_rows = (db.session.query(
+                      func.date(Commit.timestamp).label('day'),
+                      func.count(Commit.id).label('commits'),
+                      func.sum(case((or_(commit_hour >= 22, commit_hour < 4), 1), else_=0)).label('late_night'),
+                      func.sum(case((extract('dow', Commit.timestamp).in_([0, 6]), 1), else_=0)).label('weekend'),
+                      func.count(func.distinct(commit_hour)).label('active_hours'))
+                  .join(Repository)
+                  .filter(*commit_filter)
+                  .group_by(func.date(Commit.timestamp))
+                  .all())
 
-    total_commits = len(commits)
+    total_commits = sum(row.commits for row in daily_rows)
 
     # Early-exit defaults when no commits are found
-    if not commits:
+    if not total_commits:
         git_data = {
             'weekly_hours': 0,
             'avg_daily_commits': 0,
@@ -100,61 +246,44 @@ def index():
             'max_commit_streak_hours': 0,
         }
     else:
-        from collections import defaultdict
-        from statistics import variance
-
-        daily_counts = defaultdict(int)
-        distinct_hours = set()
-        late_night = 0
-        weekend = 0
-        authors = set()
-
-        timestamps = []
-
-        for c in commits:
-            ts = c.timestamp
-            timestamps.append(ts)
-            authors.add(c.author)
-
-            daily_counts[ts.date()] += 1
-            distinct_hours.add((ts.date(), ts.hour))
-
-            if ts.hour >= 22 or ts.hour < 4:
-                late_night += 1
-            if ts.weekday() >= 5:
-                weekend += 1
+        late_night = int(sum(row.late_night or 0 for row in daily_rows))
+        weekend = int(sum(row.weekend or 0 for row in daily_rows))
+        distinct_hours = sum(row.active_hours for row in daily_rows)
+        author_count = (db.session.query(func.count(func.distinct(Commit.author)))
+                        .join(Repository)
+                        .filter(*commit_filter)
+                        .scalar()) or 0
 
         # Metrics calculations
         avg_daily_commits = total_commits / lookback_days
 
-        if len(daily_counts) > 1:
-            schedule_var = variance(daily_counts.values())
+        if len(daily_rows) > 1:
+            schedule_var = float(np.var([row.commits for row in daily_rows], ddof=1))
             schedule_regularity = max(0.0, 1.0 - min(schedule_var / 10.0, 1.0))  # Normalize
         else:
             schedule_regularity = 1.0
 
-        collaboration_score = max(0.0, (len(authors) - 1) / len(authors)) if authors else 0.0
+        collaboration_score = max(0.0, (author_count - 1) / author_count) if author_count else 0.0
 
         weekend_commit_ratio = weekend / total_commits if total_commits else 0.0
 
-        weekly_hours = (len(distinct_hours) / lookback_days) * 7
-
-        # Longest streak where consecutive commits are within 1-hour gaps
-        timestamps.sort()
-        max_streak_hours = 0.0
-        streak_start = timestamps[0]
-        for i in range(1, len(timestamps)):
-            diff_hours = (timestamps[i] - timestamps[i - 1]).total_seconds() / 3600.0
-            if diff_hours <= 1:
-                # extend streak
-                continue
-            else:
-                streak_length = (timestamps[i - 1] - streak_start).total_seconds() / 3600.0
-                max_streak_hours = max(max_streak_hours, streak_length)
-                streak_start = timestamps[i]
-        # Final streak from last segment
-        final_streak = (timestamps[-1] - streak_start).total_seconds() / 3600.0
-        max_streak_hours = max(max_streak_hours, final_streak)
+        weekly_hours = (distinct_hours / lookback_days) * 7
+
+        # Longest streak where consecutive commits are within 1-hour gaps;
+        # only timestamps are needed, already sorted by the database
+        timestamps = np.fromiter(
+            (ts for (ts,) in db.session.query(Commit.timestamp)
+             .join(Repository)
+             .filter(*commit_filter)
+             .order_by(Commit.timestamp)
+             .yield_per(10000)),
+            dtype='datetime64[s]'
+        )
+        seconds = timestamps.astype(np.int64)
+        breaks = np.flatnonzero(np.diff(seconds) > 3600)
+        streak_starts = np.r_[0, breaks + 1]
+        streak_ends = np.r_[breaks, seconds.size - 1]
+        max_streak_hours = float((seconds[streak_ends] - seconds[streak_starts]).max()) / 3600.0
 
         git_data = {
             'weekly_hours': round(weekly_hours, 1),
@@ -168,12 +297,10 @@ def index():
     
     # Prepare journal data for analysis
     journal_data = {
-        'avg_sentiment': float(journal_sentiment.avg_sentiment) if journal_sentiment and journal_sentiment.avg_sentiment is not None else 0,
-        'entry_count': journal_sentiment.entry_count if journal_sentiment else 0,
-        'days_since_last_journal': (datetime.utcnow() - 
-            JournalEntry.query.filter_by(user_id=current_user.id)
-            .order_by(JournalEntry.created_at.desc())
-            .first().created_at).days if JournalEntry.query.filter_by(user_id=current_user.id).first() else 999
+        'avg_sentiment': float(journal_stats.avg_sentiment) if journal_stats.avg_sentiment is not None else 0,
+        'entry_count': journal_stats.entry_count,
+        'days_since_last_journal': (now - journal_stats.last_created_at).days
+            if journal_stats.last_created_at else 999
     }
     
     # Generate wellness recommendations
@@ -193,61 +320,98 @@ def index():
     # Calculate wellness score (0-10 scale)
     wellness_score = max(0, min(10, 8 - (burnout_analysis['risk_score'] * 5)))
     
-    # Persist / update today's wellness snapshot
-    today = datetime.utcnow().date()
-    snap = WellnessSnapshot.query.filter_by(user_id=current_user.id, snapshot_date=today).first()
-    if not snap:
-        snap = WellnessSnapshot(user_id=current_user.id, snapshot_date=today)
-
-    # update fields
-    snap.weekly_hours = git_data['weekly_hours']
-    snap.avg_daily_commits = git_data['avg_daily_commits']
-    snap.schedule_regularity = git_data['schedule_regularity']
-    snap.collaboration_score = git_data['collaboration_score']
-    snap.late_night_commits = git_data['late_night_commits']
-    snap.weekend_commit_ratio = git_data['weekend_commit_ratio']
-    snap.max_commit_streak_hours = git_data['max_commit_streak_hours']
-
-    snap.avg_sentiment = journal_data['avg_sentiment']
-    snap.entry_count = journal_data['entry_count']
-    snap.days_since_last_journal = journal_data['days_since_last_journal']
-
-    snap.wellness_score = wellness_score
-    snap.burnout_risk = burnout_analysis['risk_score'] if isinstance(burnout_analysis, dict) else 0
-
-    from extensions import db
-    db.session.add(snap)
-    db.session.commit()
-
-    # Get statistics
-    stats = {
-        'total_journals': JournalEntry.query.filter_by(user_id=current_user.id).count(),
-        'total_repos': len(repos),
+    details = {
         'total_commits': total_commits,
-        'total_authors': total_authors,
-        'recent_activity': recent_activity[:5],
-        'risky_repos': [{
-            'id': r.id,
-            'name': r.name,
-            'risk_score': round((r.burnout_risk or 0) * 100, 1),
-            'last_analyzed': r.last_analyzed.strftime('%Y-%m-%d') if r.last_analyzed else 'Never'
-        } for r in risky_repos],
-        'wellness': {
-            'score': round(wellness_score, 1),
-            'level': 'Excellent' if wellness_score >= 8 else 'Good' if wellness_score >= 6 else 'Needs Attention',
-            'trend': 'up' if wellness_score >= 7 else 'down' if wellness_score <= 5 else 'stable',
-            'burnout_risk': burnout_analysis,
-            'tips': wellness_tips,
-            'work_life_tips': work_life_tips
-        }
+        'wellness_score': wellness_score,
+        'burnout_analysis': burnout_analysis,
+        'wellness_tips': wellness_tips,
+        'work_life_tips': work_life_tips,
     }
-    
-    return render_template(
-        'dashboard.html',
-        recent_entries=recent_entries,
-        recent_repos=recent_repos,
-        stats=stats
-    )
+
+    # Persist / update today's wellness snapshot; git_data and journal_data
+    # keys match the snapshot's column names
+    _upsert_snapshot(current_user.id, now.date(), {
+        **git_data,
+        **journal_data,
+        'wellness_score': wellness_score,
+        'burnout_risk': burnout_analysis['risk_score'] if isinstance(burnout_analysis, dict) else 0,
+        'wellness_details': json.dumps(details),
+        'updated_at': now,
+    })
+
+    return details
+
+
+# Wellness resources by category; static, so built once at import along with
+# the flattened list shown when no category is selected
+_RESOURCES = {
+    'stress_relief': [
+        {
+            'title': '5-Minute Breathing Exercise',
+            'description': 'A quick guided breathing exercise to reduce stress and anxiety.',
+            'url': 'https://www.healthline.com/health/breathing-exercise',
+            'duration': '5 min'
+        },
+        {
+            'title': 'Progressive Muscle Relaxation',
+            'description': 'Step-by-step guide to releasing tension throughout your body.',
+            'url': 'https://www.healthline.com/health/progressive-muscle-relaxation',
+            'duration': '10 min'
+        }
+    ],
+    'sleep': [
+        {
+            'title': 'Sleep Hygiene Tips',
+            'description': 'Best practices for improving your sleep quality.',
+            'url': 'https://www.sleepfoundation.org/sleep-hygiene',
+            'duration': '5 min read'
+        },
+        {
+            'title': 'Guided Sleep Meditation',
+            'description': 'A calming meditation to help you fall asleep faster.',
+            'url': 'https://www.headspace.com/sleep',
+            'duration': '15 min'
+        }
+    ],
+    'productivity': [
+        {
+            'title': 'Pomodoro Technique',
+            'description': 'A time management method to boost productivity.',
+            'url': 'https://todoist.com/productivity-methods/pomodoro-technique',
+            'duration': '5 min read'
+        },
+        {
+            'title': 'Time Blocking Guide',
+            'description': 'How to organize your day for maximum efficiency.',
+            'url': 'https://www.calendar.com/blog/time-blocking/',
+            'duration': '8 min read'
+        }
+    ],
+    'breaks': [
+        {
+            'title': 'Desk Stretches',
+            'description': 'Simple stretches you can do at your desk to prevent stiffness.',
+            'url': 'https://www.healthline.com/health/desk-stretches',
+            'duration': '5 min'
+        },
+        {
+            'title': '20-20-20 Rule',
+            'description': 'Prevent eye strain with this simple technique.',
+            'url': 'https://www.healthline.com/health/eye-health/20-20-20-rule',
+            'duration': '1 min read'
+        }
+    ]
+}
+
+_ALL_RESOURCES = [resource for category_resources in _RESOURCES.values() for resource in category_resources]
+
+_CATEGORIES = (
+    ('stress_relief', 'Stress Relief'),
+    ('sleep', 'Sleep'),
+    ('productivity', 'Productivity'),
+    ('breaks', 'Breaks')
+)
+
 
 @dashboard_bp.route('/wellness-resources')
 @login_required
@@ -257,84 +421,15 @@ def wellness_resources():
     """
     category = request.args.get('category', '').lower()
     
-    # Define wellness resources by category
-    resources = {
-        'stress_relief': [
-            {
-                'title': '5-Minute Breathing Exercise',
-                'description': 'A quick guided breathing exercise to reduce stress and anxiety.',
-                'url': 'https://www.healthline.com/health/breathing-exercise',
-                'duration': '5 min'
-            },
-            {
-                'title': 'Progressive Muscle Relaxation',
-                'description': 'Step-by-step guide to releasing tension throughout your body.',
-                'url': 'https://www.healthline.com/health/progressive-muscle-relaxation',
-                'duration': '10 min'
-            }
-        ],
-        'sleep': [
-            {
-                'title': 'Sleep Hygiene Tips',
-                'description': 'Best practices for improving your sleep quality.',
-                'url': 'https://www.sleepfoundation.org/sleep-hygiene',
-                'duration': '5 min read'
-            },
-            {
-                'title': 'Guided Sleep Meditation',
-                'description': 'A calming meditation to help you fall asleep faster.',
-                'url': 'https://www.headspace.com/sleep',
-                'duration': '15 min'
-            }
-        ],
-        'productivity': [
-            {
-                'title': 'Pomodoro Technique',
-                'description': 'A time management method to boost productivity.',
-                'url': 'https://todoist.com/productivity-methods/pomodoro-technique',
-                'duration': '5 min read'
-            },
-            {
-                'title': 'Time Blocking Guide',
-                'description': 'How to organize your day for maximum efficiency.',
-                'url': 'https://www.calendar.com/blog/time-blocking/',
-                'duration': '8 min read'
-            }
-        ],
-        'breaks': [
-            {
-                'title': 'Desk Stretches',
-                'description': 'Simple stretches you can do at your desk to prevent stiffness.',
-                'url': 'https://www.healthline.com/health/desk-stretches',
-                'duration': '5 min'
-            },
-            {
-                'title': '20-20-20 Rule',
-                'description': 'Prevent eye strain with this simple technique.',
-                'url': 'https://www.healthline.com/health/eye-health/20-20-20-rule',
-                'duration': '1 min read'
-            }
-        ]
-    }
-    
-    # Get all categories for the filter
-    all_categories = [
-        ('stress_relief', 'Stress Relief'),
-        ('sleep', 'Sleep'),
-        ('productivity', 'Productivity'),
-        ('breaks', 'Breaks')
-    ]
-    
-    # Filter resources by category if specified
-    filtered_resources = resources.get(category, [])
-    
-    # If no category is specified, show all resources
+    # Show all resources when no category is specified
     if not category:
-        filtered_resources = [resource for category_resources in resources.values() for resource in category_resources]
+        filtered_resources = _ALL_RESOURCES
+    else:
+        filtered_resources = _RESOURCES.get(category, [])
     
     return render_template(
         'wellness_resources.html',
         resources=filtered_resources,
-        categories=all_categories,
+        categories=_CATEGORIES,
         current_category=category
     )
@@ -1,20 +1,77 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_required, current_user
 from models.journal import JournalEntry
-from app import db
-from ai_services.sentiment_analyzer import analyze_sentiment_with_api
+from extensions import db
+from ai_services.sentiment_analyzer import analyze_sentiment_cached
 from forms import JournalEntryForm
-from datetime import datetime
+from utils.cache import invalidate_dashboard_cache
+from datetime import datetime, timedelta
+from sqlalchemy import case
+from concurrent.futures import ThreadPoolExecutor
+import threading
 
 # Create blueprint
 journal_bp = Blueprint('journal', __name__)
 
+# Sentiment is analyzed off the request thread; entries read as 'pending'
+# (with no score, so averages skip them) until the job finishes
+_sentiment_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='sentiment')
+
+# Entries still pending after this long are assumed lost (the process that
+# queued them restarted or the job failed) and are queued again when read
+_PENDING_RETRY_AFTER = timedelta(minutes=2)
+
+# Entries with a job queued or running in this process
+_queued_ids = set()
+_queued_lock = threading.Lock()
+
+def _update_sentiment(app, entry_id, content):
+    """Analyze an entry's content and store the result; runs on the sentiment executor."""
+    with app.app_context():
+        try:
+            sentiment = analyze_sentiment_cached(content)
+            entry = db.session.get(JournalEntry, entry_id)
+            # Skip if the entry was deleted or edited again since this job was queued
+            if entry is None or entry.content != content:
+                return
+            entry.sentiment_score = sentiment['score']
+            entry.sentiment_label = sentiment['label']
+            db.session.commit()
+            invalidate_dashboard_cache(entry.user_id)
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Error analyzing journal sentiment: {str(e)}")
+        finally:
+            with _queued_lock:
+                _queued_ids.discard(entry_id)
+
+def _queue_sentiment(entry):
+    """Schedule sentiment analysis for a committed entry."""
+    with _queued_lock:
+        if entry.id in _queued_ids:
+            return
+        _queued_ids.add(entry.id)
+    app = current_app._get_current_object()
+    _sentiment_executor.submit(_update_sentiment, app, entry.id, entry.content)
+
+def _requeue_stale_pending(user_id):
+    """Queue analysis again for a user's entries left pending by a lost job."""
+    cutoff = datetime.utcnow() - _PENDING_RETRY_AFTER
+    stale = db.session.query(JournalEntry.id, JournalEntry.content)\
+        .filter(JournalEntry.user_id == user_id,
+                JournalEntry.sentiment_label == 'pending',
+                JournalEntry.updated_at < cutoff)\
+        .all()
+    for entry in stale:
+        _queue_sentiment(entry)
+
 @journal_bp.route('/')
 @login_required
 def index():
     page = request.args.get('page', 1, type=int)
     per_page = 10
     sentiment_filter = request.args.get('sentiment', type=str)
+    _requeue_stale_pending(current_user.id)
     
     # Base query
     query = JournalEntry.query.filter_by(user_id=current_user.id)
@@ -27,27 +84,23 @@ def index():
     entries = query.order_by(JournalEntry.created_at.desc())\
                  .paginate(page=page, per_page=per_page, error_out=False)
     
-    # Get sentiment counts for all entries (not filtered)
-    sentiment_counts = db.session.query(
-        JournalEntry.sentiment_label,
-        db.func.count(JournalEntry.id)
-    ).filter_by(user_id=current_user.id)\
-     .group_by(JournalEntry.sentiment_label)\
-     .all()
-    
-    # Convert to dictionary for easier access in template
-    sentiment_dict = {label: count for label, count in sentiment_counts}
+    # Sentiment counts, averages and the latest entry timestamp for all
+    # entries (not filtered), in a single aggregate row
+    def label_count(label):
+        return db.func.sum(case((JournalEntry.sentiment_label == label, 1), else_=0))
 
-    # --- New aggregated stats for wellness recommendations ---
     sentiment_stats = db.session.query(
         db.func.avg(JournalEntry.sentiment_score).label('avg_sentiment'),
-        db.func.avg(db.func.length(JournalEntry.content)).label('avg_length')
-    ).filter_by(user_id=current_user.id).first()
+        db.func.avg(db.func.length(JournalEntry.content)).label('avg_length'),
+        db.func.max(JournalEntry.created_at).label('last_created_at'),
+        label_count('positive').label('positive'),
+        label_count('neutral').label('neutral'),
+        label_count('negative').label('negative')
+    ).filter_by(user_id=current_user.id).one()
 
-    last_entry = JournalEntry.query.filter_by(user_id=current_user.id)\
-        .order_by(JournalEntry.created_at.desc()).first()
     last_entry_days_ago = (
-        (datetime.utcnow() - last_entry.created_at).days if last_entry else None
+        (datetime.utcnow() - sentiment_stats.last_created_at).days
+        if sentiment_stats.last_created_at else None
     )
 
     avg_entry_length = (
@@ -58,9 +111,9 @@ def index():
         'journal.html',
         entries=entries,
         sentiment_counts={
-            'positive': sentiment_dict.get('positive', 0),
-            'neutral': sentiment_dict.get('neutral', 0),
-            'negative': sentiment_dict.get('negative', 0)
+            'positive': int(sentiment_stats.positive or 0),
+            'neutral': int(sentiment_stats.neutral or 0),
+            'negative': int(sentiment_stats.negative or 0)
         },
         current_sentiment=sentiment_filter,
         sentiment_stats=sentiment_stats,
@@ -76,6 +129,8 @@ def view_entry(entry_id):
     if entry.user_id != current_user.id:
         flash('You do not have permission to view this entry', 'danger')
         return redirect(url_for('journal.index'))
+    if entry.sentiment_label == 'pending' and (entry.updated_at or datetime.min) < datetime.utcnow() - _PENDING_RETRY_AFTER:
+        _queue_sentiment(entry)
     return render_template('journal_entry.html', entry=entry)
 
 @journal_bp.route('/new', methods=['GET', 'POST'])
@@ -84,19 +139,20 @@ def new_entry():
     form = JournalEntryForm()
     
     if form.validate_on_submit():
-        # Analyze sentiment
-        sentiment = analyze_sentiment_with_api(form.content.data)
-        
         entry = JournalEntry(
             title=form.title.data,
             content=form.content.data,
             user_id=current_user.id,
-            sentiment_score=sentiment['score'],
-            sentiment_label=sentiment['label']
+            sentiment_score=None,
+            sentiment_label='pending'
         )
         
         db.session.add(entry)
         db.session.commit()
+        invalidate_dashboard_cache(current_user.id)
+        
+        # Analyze sentiment in the background
+        _queue_sentiment(entry)
         
         flash('Journal entry created successfully!', 'success')
         return redirect(url_for('journal.view_entry', entry_id=entry.id))
@@ -114,16 +170,20 @@ def edit_entry(entry_id):
         return redirect(url_for('journal.index'))
     
     if request.method == 'POST':
+        original_content = entry.content
         entry.title = request.form.get('title', entry.title)
         entry.content = request.form.get('content', entry.content)
         
-        # Re-analyze sentiment if content changed
-        if entry.content != request.form.get('content'):
-            sentiment = analyze_sentiment_with_api(entry.content)
-            entry.sentiment_score = sentiment['score']
-            entry.sentiment_label = sentiment['label']
+        # Re-analyze sentiment in the background if content changed
+        content_changed = entry.content != original_content
+        if content_changed:
+            entry.sentiment_score = None
+            entry.sentiment_label = 'pending'
         
         db.session.commit()
+        invalidate_dashboard_cache(current_user.id)
+        if content_changed:
+            _queue_sentiment(entry)
         flash('Entry updated successfully!', 'success')
         return redirect(url_for('journal.view_entry', entry_id=entry.id))
     
@@ -141,6 +201,7 @@ def delete_entry(entry_id):
     
     db.session.delete(entry)
     db.session.commit()
+    invalidate_dashboard_cache(current_user.id)
     
     flash('Entry deleted successfully!', 'success')
     return redirect(url_for('journal.index'))
@@ -5,19 +5,86 @@ from flask_wtf.csrf import generate_csrf
 from models.repository import Repository, Commit
 from extensions import db
 from forms import RepositoryForm
+from utils.cache import invalidate_dashboard_cache
 from ai_services.git_analyzer import GitAnalyzer
 import git
 from datetime import datetime, timedelta
-import json
+import shutil
+import subprocess
+from sqlalchemy.exc import IntegrityError
+from concurrent.futures import ThreadPoolExecutor
 
 # Create blueprint
 repo_bp = Blueprint('repository', __name__)
 
+# Cloning, pulling and commit import run off the request thread; the
+# repository row reads last_analysis_status 'pending' until the job finishes
+_sync_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='repo-sync')
+
+def _finish_sync(repo_id, status):
+    repository = db.session.get(Repository, repo_id)
+    if repository is not None:
+        repository.last_analysis_status = status
+        db.session.commit()
+
+def _clone_and_analyze(app, repo_id, repo_url, local_path, author_email):
+    """Clone a newly added repository and import its commits; runs on the sync executor."""
+    with app.app_context():
+        try:
+            # Analysis only walks the default branch, so skip other branches and tags
+            repo = git.Repo.clone_from(repo_url, local_path, multi_options=['--single-branch', '--no-tags'])
+            repository = db.session.get(Repository, repo_id)
+            repository.last_commit_date = _head_commit_date(local_path)
+            db.session.commit()
+
+            analyze_repository_commits(repo_id, repo, author_email)
+            _finish_sync(repo_id, None)
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Error cloning repository {repo_id}: {str(e)}")
+            _finish_sync(repo_id, 'failed')
+            shutil.rmtree(local_path, ignore_errors=True)
+
+def _refresh_and_analyze(app, repo_id, author_email):
+    """Pull the latest changes and import new commits; runs on the sync executor."""
+    with app.app_context():
+        try:
+            repository = db.session.get(Repository, repo_id)
+            old_head = _git(repository.local_path, 'rev-parse', 'HEAD').strip()
+            _git(repository.local_path, 'pull', '--ff-only', '--no-tags')
+            new_head = _git(repository.local_path, 'rev-parse', 'HEAD').strip()
+
+            # Update the repository record
+            repository.updated_at = datetime.utcnow()
+            if new_head != old_head:
+                repository.last_commit_date = _head_commit_date(repository.local_path)
+            db.session.commit()
+
+            # Only the commits the pull brought in need importing
+            if new_head != old_head:
+                analyze_repository_commits(repo_id, git.Repo(repository.local_path), author_email,
+                                           rev_range=f"{old_head}..{new_head}")
+            _finish_sync(repo_id, None)
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Error refreshing repository {repo_id}: {str(e)}")
+            _finish_sync(repo_id, 'failed')
+
 @repo_bp.route('/')
 @login_required
 def index():
     repositories = Repository.query.filter_by(user_id=current_user.id).all()
-    return render_template('repository_list.html', repositories=repositories)
+    
+    # Commit counts for every repository in one grouped query
+    commit_counts = dict(
+        db.session.query(Commit.repository_id, db.func.count(Commit.id))
+        .join(Repository)
+        .filter(Repository.user_id == current_user.id)
+        .group_by(Commit.repository_id)
+        .all()
+    )
+    return render_template('repository_list.html', repositories=repositories,
+                           commit_counts=commit_counts)
 
 @repo_bp.route('/add', methods=['GET', 'POST'])
 @login_required
@@ -33,85 +100,51 @@ def add_repository():
                 form.name.data.lower().replace(' ', '_')
             )
             
-            # Clone the repository
-            repo = git.Repo.clone_from(form.repo_url.data, local_path)
-
-            last_commit = repo.head.commit
-            last_commit_date = last_commit.committed_datetime 
-            
-            # Create repository record
+            # Create repository record; the clone and commit import run in
+            # the background
             repository = Repository(
                 name=form.name.data,
                 repo_url=form.repo_url.data,
                 description=form.description.data,
                 local_path=local_path,
-                user_id=current_user.id,
-                last_commit_date=last_commit_date
+                user_id=current_user.id
             )
+            repository.last_analysis_status = 'pending'
             
             db.session.add(repository)
             db.session.commit()
             
-            # Analyze commits
-            analyze_repository_commits(repository.id, repo)
+            _sync_executor.submit(
+                _clone_and_analyze, current_app._get_current_object(), repository.id,
+                repository.repo_url, local_path, current_user.email
+            )
             
-            flash('Repository added and analyzed successfully!', 'success')
+            flash('Repository added. Cloning and analysis are running in the background.', 'success')
             return redirect(url_for('repository.view_repository', repo_id=repository.id))
             
+        except IntegrityError:
+            # A concurrent submit got past the form checks; the unique constraints caught it
+            db.session.rollback()
+            flash('You already have a repository with this name or URL.', 'danger')
         except Exception as e:
             db.session.rollback()
             flash(f'Error adding repository: {str(e)}', 'danger')
-            # Clean up if there was an error
-            if 'local_path' in locals() and os.path.exists(local_path):
-                import shutil
-                shutil.rmtree(local_path, ignore_errors=True)
     
     return render_template('repository_form.html', form=form)
 
-@repo_bp.route('/<int:repo_id>')
-@login_required
-def view_repository(repo_id):
-    repository = Repository.query.get_or_404(repo_id)
-    
-    # Ensure the user owns this repository
-    if repository.user_id != current_user.id:
-        flash('You do not have permission to view this repository', 'danger')
-        return redirect(url_for('repository.index'))
-    
-    # Get recent commits
-    recent_commits = Commit.query\
-        .filter_by(repository_id=repository.id)\
-        .order_by(Commit.timestamp.desc())\
-        .limit(10)\
-        .all()
-    
-    # Get commit statistics
-    commit_stats = {
-        'total_commits': Commit.query.filter_by(repository_id=repository.id).count(),
-        'total_lines_added': db.session.query(db.func.sum(Commit.lines_added))\
-            .filter_by(repository_id=repository.id).scalar() or 0,
-        'total_lines_removed': db.session.query(db.func.sum(Commit.lines_removed))\
-            .filter_by(repository_id=repository.id).scalar() or 0,
-    }
-    
-    # Get analysis data if available
-    analysis_data = {}
-    if repository.analysis_summary:
-        try:
-            analysis_data = json.loads(repository.analysis_summary)
-        except (json.JSONDecodeError, AttributeError):
-            current_app.logger.warning(f'Invalid analysis data for repository {repository.id}')
-    
+def _build_chart_data(analysis_data):
+    """Derive the repository page's chart arrays from an analysis result."""
     # Prepare data for charts
     chart_data = {}
     if 'commit_patterns' in analysis_data:
         # Prepare commit frequency chart data
         hour_dist = analysis_data['commit_patterns'].get('commit_hour_distribution', {})
-        chart_data['commit_hours'] = [hour_dist.get(str(h), 0) for h in range(24)]
+        # Keys are ints on a fresh analysis and strings once it has been stored as JSON
+        chart_data['commit_hours'] = [hour_dist.get(h, hour_dist.get(str(h), 0)) for h in range(24)]
         
         day_dist = analysis_data['commit_patterns'].get('commit_day_distribution', {})
         days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-        chart_data['commit_days'] = [day_dist.get(str(i), 0) for i in range(7)]
+        chart_data['commit_days'] = [day_dist.get(i, day_dist.get(str(i), 0)) for i in range(7)]
         chart_data['day_labels'] = days
     
     if 'sentiment_analysis' in analysis_data:
@@ -133,6 +166,49 @@ def view_repository(repo_id):
             'risk_score': (burnout.get('burnout_risk', 0) * 100) if 'burnout_risk' in burnout else 0
         }
     
+    return chart_data
+
+@repo_bp.route('/<int:repo_id>')
+@login_required
+def view_repository(repo_id):
+    repository = Repository.query.get_or_404(repo_id)
+    
+    # Ensure the user owns this repository
+    if repository.user_id != current_user.id:
+        flash('You do not have permission to view this repository', 'danger')
+        return redirect(url_for('repository.index'))
+    
+    # Get commit statistics, stored on the repository by the last commit
+    # import; older rows without them fall back to one aggregate query
+    if repository.commit_count is None:
+        _store_commit_totals(repository)
+        db.session.commit()
+    commit_stats = {
+        'total_commits': repository.commit_count,
+        'total_lines_added': repository.lines_added_total,
+        'total_lines_removed': repository.lines_removed_total,
+    }
+    
+    # Commit table rows, newest first, streamed as column tuples instead of
+    # loading the whole repository.commits collection as ORM objects
+    commits = (
+        db.session.query(Commit.commit_hash, Commit.message, Commit.timestamp,
+                         Commit.lines_added, Commit.lines_removed)
+        .filter(Commit.repository_id == repository.id)
+        .order_by(Commit.timestamp.desc())
+        .yield_per(1000)
+    )
+    first_commit_at = db.session.query(db.func.min(Commit.timestamp))\
+        .filter(Commit.repository_id == repository.id)\
+        .scalar()
+    
+    # Analysis results and chart arrays are stored ready to use; rows
+    # analyzed before chart_data existed derive it on the fly
+    analysis_data = repository.analysis_summary or {}
+    chart_data = repository.chart_data
+    if chart_data is None:
+        chart_data = _build_chart_data(analysis_data)
+    
     now = datetime.utcnow()
     
     # Prepare wellness recommendation data
@@ -145,56 +221,153 @@ def view_repository(repo_id):
     return render_template(
         'repository_view.html',
         repository=repository,
-        recent_commits=recent_commits,
         stats=commit_stats,
+        commits=commits,
+        first_commit_at=first_commit_at,
         analysis=analysis_data,
         chart_data=chart_data,
         Commit=Commit,
-        form=RepositoryForm(current_user=current_user),
         last_analyzed=repository.last_analyzed,
         now=now,
         wellness_context=wellness_context
     )
 
-def analyze_repository_commits(repo_id, git_repo):
-    """Analyze commits for a repository and store them in the database."""
+# `git log` describes each commit as a \x1e-prefixed header of
+# \x1f-separated fields (the full message last), followed by --numstat rows
+_GIT_LOG_FORMAT = '%x1e%H%x1f%an%x1f%ae%x1f%ct%x1f%B%x1f'
+_COMMIT_INSERT_BATCH = 1000
+
+# New commits are diffed by several `git log` processes at once; below
+# _GIT_LOG_SHARD_MIN commits a single process is used
+_GIT_LOG_WORKERS = min(8, os.cpu_count() or 1)
+_GIT_LOG_SHARD_MIN = 200
+
+def _git(repo_path, *args, stdin=None):
+    result = subprocess.run(
+        ['git', '-C', repo_path, *args], input=stdin, capture_output=True,
+        text=True, encoding='utf-8', errors='replace'
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"git {args[0]} failed: {result.stderr.strip()}")
+    return result.stdout
+
+def _head_commit_date(repo_path):
+    """Commit time of HEAD as naive UTC (like last_analyzed), read as an epoch
+    without loading the commit object."""
+    return datetime.utcfromtimestamp(int(_git(repo_path, 'log', '-1', '--format=%ct')))
+
+def _parse_git_log(output):
+    """Yield (hexsha, name, email, committed_ts, message, insertions, deletions) per commit."""
+    for record in output.split('\x1e')[1:]:
+        hexsha, name, email, committed, message, numstat = record.split('\x1f', 5)
+        insertions = deletions = 0
+        for row in numstat.splitlines():
+            added, _, rest = row.partition('\t')
+            deleted = rest.partition('\t')[0]
+            # Binary files report '-' for both counts
+            if added.isdigit():
+                insertions += int(added)
+            if deleted.isdigit():
+                deletions += int(deleted)
+        yield hexsha, name, email, int(committed), message, insertions, deletions
+
+def _log_commits(repo_path, shas):
+    """Full metadata and line counts for the given commits, from one `git log` process."""
+    output = _git(repo_path, 'log', '--no-walk=unsorted', '--stdin',
+                  f'--pretty=format:{_GIT_LOG_FORMAT}', '--numstat', stdin='\n'.join(shas) + '\n')
+    return list(_parse_git_log(output))
+
+def _new_commits(repo_path, author_email, existing_hashes, rev_range=None):
+    """
+    Yield parsed non-merge commits by `author_email` that are not yet stored,
+    optionally limited to `rev_range` (e.g. "OLD..NEW").
+    
+    Listing hashes and author emails needs no diffs, so only the new commits
+    are diffed, split across up to _GIT_LOG_WORKERS concurrent git processes.
+    """
+    listing = _git(repo_path, 'log', '--no-merges', '--pretty=format:%H%x1f%ae',
+                   *([rev_range] if rev_range else []))
+    shas = [
+        sha for sha, _, email in (line.partition('\x1f') for line in listing.splitlines())
+        if email == author_email and sha not in existing_hashes
+    ]
+    if not shas:
+        return
+    
+    shard_count = max(1, min(_GIT_LOG_WORKERS, len(shas) // _GIT_LOG_SHARD_MIN))
+    if shard_count == 1:
+        yield from _log_commits(repo_path, shas)
+        return
+    
+    shards = [shas[i::shard_count] for i in range(shard_count)]
+    with ThreadPoolExecutor(max_workers=shard_count, thread_name_prefix='git-log') as executor:
+        for commits in executor.map(lambda shard: _log_commits(repo_path, shard), shards):
+            yield from commits
+
+def _store_commit_totals(repository):
+    """Recompute a repository's commit count and line totals in one aggregate query."""
+    count, added, removed = db.session.query(
+        db.func.count(Commit.id),
+        db.func.coalesce(db.func.sum(Commit.lines_added), 0),
+        db.func.coalesce(db.func.sum(Commit.lines_removed), 0)
+    ).filter(Commit.repository_id == repository.id).one()
+    repository.commit_count = count
+    repository.lines_added_total = int(added)
+    repository.lines_removed_total = int(removed)
+
+def analyze_repository_commits(repo_id, git_repo, author_email, rev_range=None):
+    """Analyze commits by `author_email` (within `rev_range`, if given) and store them in the database."""
+    batches_committed = False
     try:
-        # Get existing commit hashes to avoid duplicates
-        existing_hashes = {c.commit_hash for c in Commit.query.filter_by(repository_id=repo_id).all()}
+        # Get existing commit hashes to avoid duplicates (hash column only, streamed)
+        existing_hashes = {
+            h for (h,) in db.session.query(Commit.commit_hash)
+            .filter(Commit.repository_id == repo_id)
+            .yield_per(10000)
+        }
         
         # Process new commits
-        for commit in git_repo.iter_commits():
-            if commit.hexsha in existing_hashes:
-                continue
-                
-            if commit.author.email != current_user.email:
-                continue
-             
-            # Count added and removed lines
-            stats = commit.stats.total
-            
-            # Create commit record
-            db_commit = Commit(
-                commit_hash=commit.hexsha,
-                author=f"{commit.author.name} <{commit.author.email}>",
-                message=commit.message,
-                timestamp=datetime.fromtimestamp(commit.committed_date),
-                lines_added=stats.get('insertions', 0),
-                lines_removed=stats.get('deletions', 0),
-                repository_id=repo_id
-            )
-            
-            db.session.add(db_commit)
+        rows = []
+        for hexsha, name, email, committed, message, insertions, deletions in _new_commits(
+                git_repo.working_tree_dir, author_email, existing_hashes, rev_range):
+            rows.append({
+                'commit_hash': hexsha,
+                'author': f"{name} <{email}>",
+                'message': message,
+                'timestamp': datetime.utcfromtimestamp(committed),
+                'lines_added': insertions,
+                'lines_removed': deletions,
+                'repository_id': repo_id
+            })
+            # Commit each batch so memory and transaction size stay flat on long histories
+            if len(rows) >= _COMMIT_INSERT_BATCH:
+                db.session.bulk_insert_mappings(Commit, rows)
+                db.session.commit()
+                batches_committed = True
+                rows.clear()
         
-        # Update last analyzed timestamp
-        repository = Repository.query.get(repo_id)
+        if rows:
+            db.session.bulk_insert_mappings(Commit, rows)
+        
+        # Update last analyzed timestamp and the stored commit totals
+        db.session.flush()
+        repository = db.session.get(Repository, repo_id)
         repository.last_analyzed = datetime.utcnow()
+        _store_commit_totals(repository)
         
         db.session.commit()
+        invalidate_dashboard_cache(repository.user_id)
         
     except Exception as e:
         current_app.logger.error(f"Error analyzing repository commits: {str(e)}")
         db.session.rollback()
+        if batches_committed:
+            # Earlier batches are kept (a retry skips them by hash); bring the
+            # stored totals in line with what actually landed
+            repository = db.session.get(Repository, repo_id)
+            _store_commit_totals(repository)
+            db.session.commit()
+            invalidate_dashboard_cache(repository.user_id)
         raise
 
 @repo_bp.route('/<int:repo_id>/refresh', methods=['POST'])
@@ -207,25 +380,14 @@ def refresh_repository(repo_id):
         flash('You do not have permission to refresh this repository', 'danger')
         return redirect(url_for('repository.index'))
         
-    try:
-        # Pull the latest changes
-        repo = git.Repo(repository.local_path)
-        origin = repo.remotes.origin
-        origin.pull()
-        
-        # Update the repository record
-        repository.updated_at = datetime.utcnow()
-        db.session.commit()
-        
-        # Re-analyze commits
-        analyze_repository_commits(repository.id, repo)
-        
-        flash('Repository refreshed successfully!', 'success')
-    except Exception as e:
-        db.session.rollback()
-        flash(f'Error refreshing repository: {str(e)}', 'danger')
+    repository.last_analysis_status = 'pending'
+    db.session.commit()
     
-    print("Repository refreshed successfully!") 
+    # Pull and re-analyze commits in the background
+    _sync_executor.submit(
+        _refresh_and_analyze, current_app._get_current_object(), repository.id, current_user.email
+    )
+    flash('Repository refresh started. New commits will appear shortly.', 'success')
     return redirect(url_for('repository.view_repository', repo_id=repository.id))
 
 @repo_bp.route('/<int:repo_id>/edit', methods=['GET', 'POST'])
@@ -238,7 +400,7 @@ def edit_repository(repo_id):
         flash('You do not have permission to edit this repository', 'danger')
         return redirect(url_for('repository.index'))
     
-    form = RepositoryForm()
+    form = RepositoryForm(current_user=current_user)
     
     if form.validate_on_submit():
         try:
@@ -249,6 +411,9 @@ def edit_repository(repo_id):
             db.session.commit()
             flash('Repository updated successfully!', 'success')
             return redirect(url_for('repository.view_repository', repo_id=repository.id))
+        except IntegrityError:
+            db.session.rollback()
+            flash('You already have a repository with this name or URL.', 'danger')
         except Exception as e:
             db.session.rollback()
             flash(f'Error updating repository: {str(e)}', 'danger')
@@ -271,14 +436,16 @@ def delete_repository(repo_id):
         return redirect(url_for('repository.index'))
     
     try:
-        # Delete the repository directory
-        if os.path.exists(repo.local_path):
-            import shutil
-            shutil.rmtree(repo.local_path)
+        local_path = repo.local_path
         
         # Delete from database
         db.session.delete(repo)
         db.session.commit()
+        invalidate_dashboard_cache(current_user.id)
+        
+        # Removing a large clone is thousands of unlinks; do it off the request thread
+        if local_path:
+            _sync_executor.submit(shutil.rmtree, local_path, ignore_errors=True)
         
         flash('Repository deleted successfully', 'success')
     except Exception as e:
@@ -310,6 +477,19 @@ def analyze_repository(repo_id):
                 'message': f'Repository not found at {repo.local_path}. Please refresh the repository first.'
             }), 404
             
+        # A sync resets the status, so 'completed' means no commits arrived since the
+        # stored summary; it only goes stale when the day-based window slides
+        if (repo.last_analysis_status == 'completed' and repo.analysis_summary
+                and repo.last_analyzed and repo.last_analyzed.date() == datetime.utcnow().date()
+                and (repo.last_commit_date is None or repo.last_commit_date <= repo.last_analyzed)):
+            return jsonify({
+                'status': 'success',
+                'message': 'Analysis is up to date',
+                'cached': True,
+                'last_analyzed': repo.last_analyzed.strftime('%Y-%m-%d %H:%M:%S'),
+                'burnout_risk': (repo.burnout_risk or 0) * 100
+            })
+        
         # Set analysis status to pending
         repo.last_analysis_status = 'pending'
         db.session.commit()
@@ -323,7 +503,8 @@ def analyze_repository(repo_id):
             
             if analysis:
                 # Update repository with analysis results
-                repo.analysis_summary = json.dumps(analysis)
+                repo.analysis_summary = analysis
+                repo.chart_data = _build_chart_data(analysis)
                 repo.last_analyzed = datetime.utcnow()
                 repo.last_analysis_status = 'completed'
                 
@@ -342,6 +523,7 @@ def analyze_repository(repo_id):
                     repo.total_authors = analysis['commit_patterns']['total_authors']
                 
                 db.session.commit()
+                invalidate_dashboard_cache(repo.user_id)
                 
                 # Return success response
                 return jsonify({
@@ -383,7 +565,7 @@ def get_repository_metrics(repo_id):
         # Return cached analysis if available and recent (less than 1 hour old)
         if repo.analysis_summary and repo.last_analyzed and \
            (datetime.utcnow() - repo.last_analyzed) < timedelta(hours=1):
-            return jsonify(json.loads(repo.analysis_summary))
+            return jsonify(repo.analysis_summary)
         
         # Otherwise perform a fresh analysis
         return redirect(url_for('repository.analyze_repository', repo_id=repo_id))
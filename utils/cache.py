@@ -0,0 +1,12 @@
+"""Cache keys shared between blueprints."""
+from extensions import cache
+
+
+def dashboard_cache_key(user_id, part='stats'):
+    """Cache key for one part ('stats' or 'wellness') of a user's dashboard."""
+    return f"dashboard:{part}:{user_id}"
+
+
+def invalidate_dashboard_cache(user_id):
+    """Drop the cached dashboard statistics and wellness cards for a user."""
+    cache.delete_many(dashboard_cache_key(user_id), dashboard_cache_key(user_id, 'wellness'))
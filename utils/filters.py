@@ -1,8 +1,31 @@
 import markdown2
+from functools import lru_cache
 from markupsafe import Markup
 
+# strftime patterns for the format_datetime filter; anything else renders as a date
+_DATETIME_FORMATS = {
+    'short': '%Y-%m-%d %H:%M',
+    'long': '%A, %d %B %Y at %I:%M%p',
+}
+
+
+@lru_cache(maxsize=4096)
+def format_datetime(value, format='short'):
+    """Format a datetime for display; memoized since list pages repeat the same timestamps."""
+    if value is None:
+        return ''
+    return value.strftime(_DATETIME_FORMATS.get(format, '%Y-%m-%d'))
+
+
+@lru_cache(maxsize=1024)
+def _render_markdown(text):
+    """Render markdown once per distinct text; pages re-render the same entries and messages."""
+    return markdown2.markdown(text)
+
+
 def register_filters(app):
     """Register custom template filters."""
+    app.add_template_filter(format_datetime, 'format_datetime')
     
     @app.template_filter('markdown')
     def markdown_to_html(text):
@@ -10,7 +33,6 @@ def register_filters(app):
         if not text:
             return ''
         # Convert markdown to HTML and mark it as safe
-        html = markdown2.markdown(text)
-        return Markup(html)
+        return Markup(_render_markdown(text))
     
     return app
@@ -1,6 +1,6 @@
 import os
-import json
-from datetime import datetime, timedelta
+import orjson
+from datetime import timedelta
 from functools import wraps
 from flask import request, redirect, url_for, flash, jsonify
 from flask_login import current_user
@@ -73,8 +73,8 @@ def get_file_extension(filename):
 
 def allowed_file(filename, allowed_extensions):
     """Check if the file has an allowed extension."""
-    return '.' in filename and \
-           get_file_extension(filename) in allowed_extensions
+    # splitext yields '' when there is no extension, which is never allowed
+    return get_file_extension(filename) in allowed_extensions
 
 def save_uploaded_file(file, upload_folder, allowed_extensions=None):
     """Save an uploaded file to the specified folder."""
@@ -97,19 +97,17 @@ def save_uploaded_file(file, upload_folder, allowed_extensions=None):
     
     return filepath
 
-def json_serial(obj):
-    """JSON serializer for objects not serializable by default json code."""
-    if isinstance(obj, (datetime, datetime.date)):
-        return obj.isoformat()
-    raise TypeError(f"Type {type(obj)} not serializable")
+# orjson encodes datetime/date natively; int dict keys (hour/day histograms)
+# and numpy values in analysis results need the extra options
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
 
 def to_json(data):
     """Convert data to JSON string."""
-    return json.dumps(data, default=json_serial)
+    return orjson.dumps(data, option=_ORJSON_OPTIONS).decode('utf-8')
 
 def from_json(json_str):
     """Convert JSON string to Python object."""
-    return json.loads(json_str) if json_str else None
+    return orjson.loads(json_str) if json_str else None
 
 def get_pagination(page, per_page=10):
     """Get pagination parameters."""
@@ -128,7 +126,8 @@ def get_pagination(page, per_page=10):
 
 def get_client_ip():
     """Get the client's IP address."""
-    if request.headers.getlist("X-Forwarded-For"):
-        return request.headers.getlist("X-Forwarded-For")[0]
-    else:
-        return request.remote_addr
+    forwarded_for = request.headers.get("X-Forwarded-For")
+    if forwarded_for:
+        # The left-most entry is the originating client
+        return forwarded_for.split(",", 1)[0].strip()
+    return request.remote_addr
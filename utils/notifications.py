@@ -1,14 +1,179 @@
 """Notification utilities for DevWell application."""
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union
-from flask import current_app, render_template
+from typing import Dict, List, Optional, Tuple, Union
+from concurrent.futures import Future, ThreadPoolExecutor
+from smtplib import (SMTPAuthenticationError, SMTPException, SMTPRecipientsRefused,
+                     SMTPResponseException)
+from flask import current_app
+from jinja2 import Template
 from flask_mail import Message
-from extensions import mail
+from sqlalchemy import func, lambda_stmt, select, update
+from sqlalchemy.orm import load_only
+from extensions import db, mail, new_wellness_recommender
 from models.user import User
+from models.journal import JournalEntry
+from models.repository import Repository
 import logging
+import os
+import random
+import time
 
 logger = logging.getLogger(__name__)
 
+# Emails are delivered off the caller's thread so a scheduler run only pays
+# for queueing; transient SMTP and network errors are retried with jittered
+# exponential backoff
+_mail_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='mail')
+_MAIL_MAX_RETRIES = 3
+_MAIL_RETRY_BACKOFF = 2  # seconds, doubled per attempt
+_MAIL_TRANSIENT_ERRORS = (SMTPException, ConnectionError, TimeoutError)
+
+# Date line shown in notification emails
+_EMAIL_DATE_FORMAT = "%A, %B %d, %Y"
+
+# Recipients streamed, and given tips, per batch in a scheduler run
+_TIPS_BATCH_SIZE = 500
+
+def _recipients_stmt():
+    """Users who want notifications, with just the columns the scheduler reads.
+    
+    Both notification timestamps come back on the same row, so deciding what
+    a user is due costs no further queries. A lambda statement is cached on
+    the lambda's code, so periodic runs reuse its construction and SQL cache
+    key instead of rebuilding the query.
+    """
+    return lambda_stmt(lambda: select(User).options(
+        load_only(User.id, User.email, User.last_daily_tip_at, User.last_burnout_check_at)
+    ).where(
+        User.email.isnot(None),
+        User.confirmed.is_(True),
+        User.notifications_enabled.is_(True)
+    ))
+
+# Compiled (html, txt) template pairs per email template name; rendered
+# directly so each send skips Flask's loader lookup and context processors
+_EMAIL_TEMPLATES: Dict[str, Tuple[Template, Template]] = {}
+
+def _email_templates(template: str, env=None) -> Tuple[Template, Template]:
+    templates = _EMAIL_TEMPLATES.get(template)
+    if templates is None:
+        env = env or current_app.jinja_env
+        templates = _EMAIL_TEMPLATES[template] = (
+            env.get_template(f"emails/{template}.html"),
+            env.get_template(f"emails/{template}.txt"),
+        )
+    return templates
+
+def preload_email_templates(app) -> None:
+    """Compile every email template at startup (filling the bytecode cache on first boot)."""
+    names = app.jinja_env.list_templates(filter_func=lambda name: name.startswith('emails/'))
+    for name in names:
+        app.jinja_env.get_template(name)
+    # Templates sent with both an html and a txt part are kept ready for send_email
+    for name in names:
+        stem, ext = os.path.splitext(name[len('emails/'):])
+        if ext == '.html' and f"emails/{stem}.txt" in names:
+            _email_templates(stem, app.jinja_env)
+
+def _is_permanent_mail_error(error: Exception) -> bool:
+    """Whether retrying the same message cannot succeed (bad login, rejected address, 5xx)."""
+    if isinstance(error, (SMTPAuthenticationError, SMTPRecipientsRefused)):
+        return True
+    return isinstance(error, SMTPResponseException) and error.smtp_code >= 500
+
+def _send_with_retry(conn, user: User, subject: str, template: str, template_vars: Dict) -> bool:
+    """Deliver one email, retrying transient SMTP and network failures with backoff.
+    
+    Permanent failures give up straight away. When a connection is being
+    reused it is reopened before retrying, as the failure may have left it
+    closed.
+    """
+    for attempt in range(_MAIL_MAX_RETRIES + 1):
+        try:
+            return NotificationManager._deliver(user, subject, template, template_vars, conn=conn)
+        except _MAIL_TRANSIENT_ERRORS as e:
+            if _is_permanent_mail_error(e):
+                logger.error("Email to %s rejected: %s", user.email, e)
+                return False
+            if attempt == _MAIL_MAX_RETRIES:
+                logger.error("Giving up on email to %s after %d attempts: %s", user.email, attempt + 1, e)
+                return False
+            logger.warning("Retrying email to %s after attempt %d failed: %s", user.email, attempt + 1, e)
+            # Jitter keeps the mail workers from retrying against the server in step
+            time.sleep(_MAIL_RETRY_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5))
+            if conn is not None and not isinstance(e, SMTPResponseException):
+                try:
+                    conn.host = conn.configure_host()
+                except _MAIL_TRANSIENT_ERRORS:
+                    # Counted against the next attempt, which fails on the dead connection
+                    pass
+        except Exception:
+            logger.error("Failed to send email to %s", user.email, exc_info=True)
+            return False
+
+def _send_emails_job(app, emails: List[Tuple[int, str, str, Dict, Optional[Dict]]]) -> int:
+    """Deliver a batch of (user_id, subject, template, template_vars, stamp) over one SMTP session.
+    
+    `stamp` holds User columns to set once that email is delivered, so a send
+    that fails for good, or never runs, leaves them for the next scheduler run.
+    Runs on the mail executor; returns the number of emails sent.
+    """
+    with app.app_context():
+        users = {
+            user.id: user
+            for user in User.query.filter(User.id.in_({user_id for user_id, *_ in emails}))
+        }
+        sent = 0
+        # Delivered user ids per stamp, written after the session
+        delivered = {}
+        try:
+            with mail.connect() as conn:
+                for user_id, subject, template, template_vars, stamp in emails:
+                    user = users.get(user_id)
+                    if user is None:
+                        logger.warning("User %s no longer exists; dropping email: %s", user_id, subject)
+                        continue
+                    if _send_with_retry(conn, user, subject, template, template_vars):
+                        sent += 1
+                        if stamp:
+                            delivered.setdefault(tuple(stamp.items()), []).append(user_id)
+        except Exception:
+            logger.error("Failed to send email batch", exc_info=True)
+        
+        try:
+            for stamp, user_ids in delivered.items():
+                _stamp_users(user_ids, **dict(stamp))
+        except Exception:
+            logger.error("Failed to record delivered emails", exc_info=True)
+            db.session.rollback()
+        return sent
+
+def _tip_context(user: User) -> Dict:
+    return {'user_id': user.id}
+
+def _email_batch(emails: List[Tuple[User, str, str, Dict]],
+                 stamp: Optional[Dict] = None) -> List[Tuple[int, str, str, Dict, Optional[Dict]]]:
+    """Reduce (user, ...) emails to the (user_id, ..., stamp) form the mail workers take.
+    
+    `stamp` is set on each user whose email is delivered (see _send_emails_job).
+    """
+    batch = []
+    for user, subject, template, template_vars in emails:
+        if not user.email:
+            logger.warning("User %s has no email address configured", user.id)
+            continue
+        batch.append((user.id, subject, template, template_vars, stamp))
+    return batch
+
+def _submit_email_batch(batch: List[Tuple[int, str, str, Dict, Optional[Dict]]]) -> List[Future]:
+    """Split a batch into MAIL_BATCH_SIZE chunks, each sent over its own SMTP session."""
+    app = current_app._get_current_object()
+    chunk_size = app.config['MAIL_BATCH_SIZE']
+    return [
+        _mail_executor.submit(_send_emails_job, app, batch[i:i + chunk_size])
+        for i in range(0, len(batch), chunk_size)
+    ]
+
 class NotificationManager:
     """Manages sending notifications to users."""
     
@@ -18,6 +183,7 @@ class NotificationManager:
         user: User,
         subject: str,
         template: str,
+        conn=None,
         **template_vars
     ) -> bool:
         """Send an email notification to the user.
@@ -26,173 +192,284 @@ class NotificationManager:
             user: The user to notify
             subject: Email subject
             template: Template name (without .html/.txt extension)
+            conn: Open connection from mail.connect() to reuse; one is opened per call otherwise
             **template_vars: Variables to pass to the template
             
         Returns:
             bool: True if email was sent successfully, False otherwise
         """
         if not user.email:
-            logger.warning(f"User {user.id} has no email address configured")
+            logger.warning("User %s has no email address configured", user.id)
             return False
             
-        try:
-            # Render both HTML and plain text versions
-            html_body = render_template(f"emails/{template}.html", user=user, **template_vars)
-            text_body = render_template(f"emails/{template}.txt", user=user, **template_vars)
-            
-            msg = Message(
-                subject=subject,
-                recipients=[user.email],
-                html=html_body,
-                body=text_body
-            )
-            
-            mail.send(msg)
-            logger.info(f"Email sent to {user.email}: {subject}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to send email to {user.email}: {str(e)}", exc_info=True)
-            return False
+        return _send_with_retry(conn, user, subject, template, template_vars)
     
     @classmethod
-    def send_daily_wellness_tips(cls, user: User) -> bool:
+    def queue_email(
+        cls,
+        user: User,
+        subject: str,
+        template: str,
+        **template_vars
+    ) -> Optional[Future]:
+        """Queue an email notification for background delivery.
+        
+        Returns:
+            Future resolving to the number of emails sent, or None if the user has no email
+        """
+        futures = cls.queue_emails([(user, subject, template, template_vars)])
+        return futures[0] if futures else None
+    
+    @classmethod
+    def queue_emails(cls, emails: List[Tuple[User, str, str, Dict]]) -> List[Future]:
+        """Queue (user, subject, template, template_vars) emails for background delivery.
+        
+        Emails go out in chunks of MAIL_BATCH_SIZE, each over its own SMTP
+        session, so the mail workers send chunks concurrently. Only user ids
+        and plain template variables are handed to the workers, which reload
+        the users in their own app context.
+        
+        Returns:
+            One future per chunk, each resolving to the number of emails it sent
+        """
+        return _submit_email_batch(_email_batch(emails))
+    
+    @classmethod
+    def _deliver(cls, user: User, subject: str, template: str, template_vars: Dict,
+                 conn=None) -> bool:
+        """Render both HTML and plain text versions and send them; raises on failure."""
+        html_template, text_template = _email_templates(template)
+        # The footer reads `now`; senders may pass their own
+        context = {'now': datetime.utcnow(), **template_vars, 'user': user}
+        html_body = html_template.render(**context)
+        text_body = text_template.render(**context)
+        
+        msg = Message(
+            subject=subject,
+            recipients=[user.email],
+            html=html_body,
+            body=text_body
+        )
+        
+        (conn or mail).send(msg)
+        logger.info("Email sent to %s: %s", user.email, subject)
+        return True
+    
+    @classmethod
+    def _send_or_collect(cls, outbox: Optional[List], user: User, subject: str, template: str,
+                         **template_vars) -> bool:
+        if outbox is None:
+            return cls.send_email(user=user, subject=subject, template=template, **template_vars)
+        outbox.append((user, subject, template, template_vars))
+        return True
+    
+    @classmethod
+    def send_daily_wellness_tips(cls, user: User, outbox: Optional[List] = None,
+                                 recommender=None, date: Optional[str] = None,
+                                 tips: Optional[List[Dict]] = None) -> bool:
         """Send daily wellness tips to the user.
         
         Args:
             user: The user to send tips to
+            outbox: Collect the email here for queue_emails instead of sending it now
+            recommender: WellnessRecommender to use; a new one around the app's model by default
+            date: Date line for the email; today's date when omitted
+            tips: Tips already generated for the user (see generate_daily_tips_batch)
             
         Returns:
-            bool: True if tips were sent successfully, False otherwise
+            bool: True if tips were sent (or queued) successfully, False otherwise
         """
-        from ai_services.wellness_recommender import WellnessRecommender
+        if recommender is None:
+            recommender = new_wellness_recommender()
         
         try:
             # Get personalized tips
-            recommender = WellnessRecommender()
-            tips = recommender.generate_daily_tips({
-                'user_id': user.id,
-                'timezone': user.timezone or 'UTC'
-            })
+            if tips is None:
+                tips = recommender.generate_daily_tips(_tip_context(user))
             
             if not tips:
-                logger.warning(f"No wellness tips generated for user {user.id}")
+                logger.warning("No wellness tips generated for user %s", user.id)
                 return False
                 
             # Send email with tips
-            return cls.send_email(
-                user=user,
-                subject="Your Daily Wellness Tips",
-                template="daily_wellness_tips",
+            return cls._send_or_collect(
+                outbox, user, "Your Daily Wellness Tips", "daily_wellness_tips",
                 tips=tips,
-                date=datetime.utcnow().strftime("%A, %B %d, %Y")
+                date=date or datetime.utcnow().strftime(_EMAIL_DATE_FORMAT)
             )
             
-        except Exception as e:
-            logger.error(f"Failed to send daily wellness tips to user {user.id}: {str(e)}", exc_info=True)
+        except Exception:
+            logger.error("Failed to send daily wellness tips to user %s", user.id, exc_info=True)
             return False
     
     @classmethod
-    def send_burnout_alert(cls, user: User, risk_level: str, suggestions: List[Dict]) -> bool:
+    def send_burnout_alert(cls, user: User, risk_level: str, suggestions: List[Dict],
+                           outbox: Optional[List] = None, date: Optional[str] = None) -> bool:
         """Send a burnout risk alert to the user.
         
         Args:
             user: The user to notify
             risk_level: One of 'low', 'moderate', 'high'
             suggestions: List of intervention suggestions
+            outbox: Collect the email here for queue_emails instead of sending it now
+            date: Date line for the email; today's date when omitted
             
         Returns:
-            bool: True if alert was sent successfully, False otherwise
+            bool: True if alert was sent (or queued) successfully, False otherwise
         """
         if risk_level == 'low':
             return False  # Don't send alerts for low risk
             
         try:
-            return cls.send_email(
-                user=user,
-                subject=f"{risk_level.title()} Burnout Risk Detected",
-                template="burnout_alert",
+            return cls._send_or_collect(
+                outbox, user, f"{risk_level.title()} Burnout Risk Detected", "burnout_alert",
                 risk_level=risk_level,
                 suggestions=suggestions,
-                date=datetime.utcnow().strftime("%A, %B %d, %Y")
+                date=date or datetime.utcnow().strftime(_EMAIL_DATE_FORMAT)
             )
             
-        except Exception as e:
-            logger.error(f"Failed to send burnout alert to user {user.id}: {str(e)}", exc_info=True)
+        except Exception:
+            logger.error("Failed to send burnout alert to user %s", user.id, exc_info=True)
             return False
 
 
+def _stamp_users(user_ids: List[int], **values) -> None:
+    """Set `values` on the given users, one UPDATE and commit per _TIPS_BATCH_SIZE ids.
+    
+    Chunking keeps each transaction's locks brief and the IN list under
+    database bind-parameter limits.
+    """
+    for i in range(0, len(user_ids), _TIPS_BATCH_SIZE):
+        db.session.execute(
+            update(User).where(User.id.in_(user_ids[i:i + _TIPS_BATCH_SIZE])).values(**values)
+        )
+        db.session.commit()
+
+
 def schedule_wellness_notifications():
     """Schedule wellness notifications for all users.
     
     This should be called by a scheduled task (e.g., Celery beat or similar).
     """
-    from models import db
-    from sqlalchemy import func
-    
     try:
-        # Get users who want to receive notifications
-        users = User.query.filter(
+        # Users who want to receive notifications
+        notify_filter = (
             User.email.isnot(None),
-            User.email_verified.is_(True),
+            User.confirmed.is_(True),
             User.notifications_enabled.is_(True)
-        ).all()
+        )
+        
+        # Last week's activity for every such user, one grouped query per source
+        now = datetime.utcnow()
+        day_ago = now - timedelta(days=1)
+        week_ago = now - timedelta(days=7)
+        date = now.strftime(_EMAIL_DATE_FORMAT)
+        recent_commits_by_user = {
+            user_id: (commit_count, total_changes)
+            for user_id, commit_count, total_changes in db.session.query(
+                Repository.user_id,
+                func.count(Repository.id),
+                func.sum(Repository.lines_added_total + Repository.lines_removed_total)
+            ).join(User, User.id == Repository.user_id).filter(
+                *notify_filter,
+                Repository.last_commit_date >= week_ago
+            ).group_by(Repository.user_id)
+        }
+        recent_entries_by_user = {
+            user_id: (avg_sentiment, entry_count)
+            for user_id, avg_sentiment, entry_count in db.session.query(
+                JournalEntry.user_id,
+                func.avg(JournalEntry.sentiment_score),
+                func.count(JournalEntry.id)
+            ).join(User, User.id == JournalEntry.user_id).filter(
+                *notify_filter,
+                JournalEntry.created_at >= week_ago
+            ).group_by(JournalEntry.user_id)
+        }
         
-        for user in users:
+        # One recommender for the whole run, around the model the app loads at startup
+        recommender = new_wellness_recommender()
+        
+        # Emails are collected and sent in chunks over shared SMTP sessions; each
+        # user's are reduced to ids right away so streamed rows can be released
+        outbox = []
+        batch = []
+        # Users whose burnout check timestamp moves forward after the loop; the
+        # daily tip timestamp is set by the mail workers once the tip is delivered
+        burnout_checked_ids = []
+        risk_by_activity = {}
+        
+        # Users due daily tips are gathered so tips are generated a batch at a time
+        tips_due = []
+        
+        def send_due_tips():
+            tips_batch = recommender.generate_daily_tips_batch([_tip_context(user) for user in tips_due])
+            for user, tips in zip(tips_due, tips_batch):
+                NotificationManager.send_daily_wellness_tips(
+                    user, outbox=outbox, recommender=recommender, date=date, tips=tips)
+            tips_due.clear()
+            batch.extend(_email_batch(outbox, stamp={'last_daily_tip_at': now}))
+            outbox.clear()
+        
+        recipients = db.session.execute(
+            _recipients_stmt(), execution_options={'yield_per': _TIPS_BATCH_SIZE}
+        ).scalars()
+        for user in recipients:
             # Check if we should send daily tips (once per day)
-            last_tip = user.get_setting('last_daily_tip')
-            if not last_tip or (datetime.utcnow() - last_tip).days >= 1:
-                if NotificationManager.send_daily_wellness_tips(user):
-                    user.set_setting('last_daily_tip', datetime.utcnow())
+            last_tip = user.last_daily_tip_at
+            if not last_tip or last_tip <= day_ago:
+                tips_due.append(user)
+                if len(tips_due) >= _TIPS_BATCH_SIZE:
+                    send_due_tips()
             
             # Check for burnout risk (if not checked today)
-            last_check = user.get_setting('last_burnout_check')
-            if not last_check or (datetime.utcnow() - last_check).days >= 1:
-                from ai_services.wellness_recommender import WellnessRecommender
-                
-                # Get user's recent activity for burnout analysis
-                recent_commits = user.repositories.with_entities(
-                    func.count('*').label('commit_count'),
-                    func.sum(Repository.lines_added + Repository.lines_removed).label('total_changes')
-                ).filter(
-                    Repository.last_commit_date >= datetime.utcnow() - timedelta(days=7)
-                ).first()
+            last_check = user.last_burnout_check_at
+            if not last_check or last_check <= day_ago:
+                # User's recent activity for burnout analysis
+                commit_count, total_changes = recent_commits_by_user.get(user.id, (0, 0))
+                avg_sentiment, entry_count = recent_entries_by_user.get(user.id, (0, 0))
+                activity = (commit_count or 0, total_changes or 0,
+                            float(avg_sentiment or 0), entry_count or 0)
                 
-                # Get recent journal sentiment
-                recent_entries = user.journal_entries.with_entities(
-                    func.avg(JournalEntry.sentiment).label('avg_sentiment'),
-                    func.count('*').label('entry_count')
-                ).filter(
-                    JournalEntry.created_at >= datetime.utcnow() - timedelta(days=7)
-                ).first()
-                
-                # Analyze burnout risk
-                recommender = WellnessRecommender()
-                risk_result = recommender.analyze_burnout_risk(
-                    git_data={
-                        'commit_count': recent_commits[0] or 0,
-                        'total_changes': recent_commits[1] or 0,
-                        'user_id': user.id
-                    },
-                    journal_data={
-                        'avg_sentiment': float(recent_entries[0] or 0),
-                        'entry_count': recent_entries[1] or 0
-                    }
-                )
+                # The risk depends only on these numbers, so users with the same
+                # activity (idle users, most commonly) share one analysis
+                risk_result = risk_by_activity.get(activity)
+                if risk_result is None:
+                    risk_result = risk_by_activity[activity] = recommender.analyze_burnout_risk(
+                        git_data={
+                            'commit_count': activity[0],
+                            'total_changes': activity[1],
+                        },
+                        journal_data={
+                            'avg_sentiment': activity[2],
+                            'entry_count': activity[3],
+                        }
+                    )
                 
                 # Update last check time regardless of result
-                user.set_setting('last_burnout_check', datetime.utcnow())
+                burnout_checked_ids.append(user.id)
                 
                 # Only send alert for moderate or high risk
                 if risk_result['risk_level'] in ['moderate', 'high']:
                     NotificationManager.send_burnout_alert(
                         user=user,
                         risk_level=risk_result['risk_level'],
-                        suggestions=risk_result['suggested_interventions']
+                        suggestions=risk_result['interventions'],
+                        outbox=outbox,
+                        date=date
                     )
+            
+            batch.extend(_email_batch(outbox))
+            outbox.clear()
+        
+        if tips_due:
+            send_due_tips()
         
+        # The streamed read is finished; write the timestamps in short transactions
         db.session.commit()
+        _stamp_users(burnout_checked_ids, last_burnout_check_at=now)
+        _submit_email_batch(batch)
         
-    except Exception as e:
-        logger.error(f"Error scheduling wellness notifications: {str(e)}", exc_info=True)
+    except Exception:
+        logger.error("Error scheduling wellness notifications", exc_info=True)
         db.session.rollback()
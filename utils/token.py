@@ -12,3 +12,15 @@ def confirm_token(token, expiration=3600):
     except:
         return False
     return email
+
+def generate_unsubscribe_token(user_id):
+    serializer = URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
+    return serializer.dumps(user_id, salt='email-unsubscribe-salt')
+
+def confirm_unsubscribe_token(token):
+    """Return the user id an unsubscribe token was issued for, or False; these links don't expire."""
+    serializer = URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
+    try:
+        return serializer.loads(token, salt='email-unsubscribe-salt')
+    except Exception:
+        return False